@@ -5,11 +5,12 @@ from __future__ import (
     unicode_literals,
 )
 
-import copy
 import logging
 import posixpath
 
 from abc import abstractmethod, ABCMeta
+from array import array
+from bisect import bisect_right
 
 from pydocx.constants import (
     EMUS_PER_PIXEL,
@@ -19,6 +20,7 @@ from pydocx.constants import (
     JUSTIFY_CENTER,
     JUSTIFY_LEFT,
     JUSTIFY_RIGHT,
+    TAGS_CONTAINING_CONTENT,
     TWIPS_PER_POINT,
 )
 from pydocx.exceptions import MalformedDocxException
@@ -27,15 +29,13 @@ from pydocx.models.styles import (
     ParagraphProperties,
     RunProperties,
 )
-from pydocx.util.memoize import MulitMemoizeMixin
 from pydocx.util.preprocessor import PydocxPreProcessor
 from pydocx.util.uri import uri_is_external
 from pydocx.util.xml import (
-    find_all,
-    find_ancestor_with_tag,
+    TagIndex,
     find_first,
-    get_list_style,
-    has_descendant_with_tag,
+    get_xml_engine,
+    iter_body_children,
 )
 from pydocx.wordml import WordprocessingDocument
 
@@ -154,21 +154,34 @@ class TagEvaluatorStringJoinedIterativeXmlParser(IterativeXmlParser):
         return result
 
 
-class DocxParser(MulitMemoizeMixin):
+class DocxParser(object):
     __metaclass__ = ABCMeta
     pre_processor_class = PydocxPreProcessor
 
+    # When streaming, the body is converted in chunks of at least this many
+    # top-level elements (more if a list is still open at that point).
+    streaming_chunk_size = 100
+
     def __init__(
         self,
         path,
         convert_root_level_upper_roman=False,
+        prefetch_workers=None,
+        streaming=False,
+        xml_engine=None,
+        **package_options
     ):
         self.path = path
+        self.prefetch_workers = prefetch_workers
+        self.streaming = streaming
+        self.xml_engine = get_xml_engine(xml_engine)
+        self.package_options = package_options
         self._parsed = ''
         self.block_text = ''
         self.page_width = 0
         self.convert_root_level_upper_roman = convert_root_level_upper_roman
         self.pre_processor = None
+        self.numbering = None
         self.visited = set()
         self.list_depth = 0
         self.footnote_index = 1
@@ -203,30 +216,64 @@ class DocxParser(MulitMemoizeMixin):
     def parse_run_properties(self, el, parsed, stack):
         properties = RunProperties.load(el)
         parent = stack[-1]['element']
-        self.styles_manager.save_properties_for_element(parent, properties)
+        self.styles_manager.save_properties_for_element(
+            parent,
+            properties,
+            frame=stack[-1],
+        )
 
     def parse_paragraph_properties(self, el, parsed, stack):
         properties = ParagraphProperties.load(el)
         parent = stack[-1]['element']
-        self.styles_manager.save_properties_for_element(parent, properties)
+        self.styles_manager.save_properties_for_element(
+            parent,
+            properties,
+            frame=stack[-1],
+        )
 
     def _load(self):
-        self.document = WordprocessingDocument(path=self.path)
+        self.document = WordprocessingDocument(
+            path=self.path,
+            xml_engine=self.xml_engine,
+            **self.package_options
+        )
+        try:
+            self._load_document()
+        finally:
+            self.document.package.close()
+
+    def _load_document(self):
         main_document_part = self.document.main_document_part
         if main_document_part is None:
             raise MalformedDocxException
 
+        if self.prefetch_workers:
+            parts = main_document_part.get_parts_to_prefetch()
+            if self.streaming:
+                # The whole document tree is never built when streaming
+                parts.remove(main_document_part)
+            main_document_part.prefetch_parts(
+                self.prefetch_workers,
+                parts=parts,
+            )
+
         self.numbering_root = None
         numbering_part = main_document_part.numbering_definitions_part
         if numbering_part:
             self.numbering_root = numbering_part.root_element
+            self.numbering = numbering_part.numbering
 
-        self.page_width = self._get_page_width(main_document_part.root_element)
         self.styles_manager = StylesManager(
             main_document_part.style_definitions_part,
         )
         self.styles = self.styles_manager.styles
-        self.parse_begin(main_document_part)
+        if self.streaming:
+            self.parse_begin_streaming(main_document_part)
+        else:
+            self.page_width = self._get_page_width(
+                main_document_part.root_element,
+            )
+            self.parse_begin(main_document_part)
 
     def load_footnotes(self, main_document_part):
         footnotes = {}
@@ -244,18 +291,7 @@ class DocxParser(MulitMemoizeMixin):
         return footnotes
 
     def parse_begin(self, main_document_part):
-        self.populate_memoization({
-            'find_all': find_all,
-            'find_first': find_first,
-            'has_descendant_with_tag': has_descendant_with_tag,
-            '_get_tcs_in_column': self._get_tcs_in_column,
-        })
-
-        self.pre_processor = self.pre_processor_class(
-            convert_root_level_upper_roman=self.convert_root_level_upper_roman,
-            styles=self.styles,
-            numbering_root=self.numbering_root,
-        )
+        self.pre_processor = self._create_pre_processor()
         self.pre_processor.perform_pre_processing(main_document_part.root_element)  # noqa
 
         self.footnote_id_to_content = self.load_footnotes(main_document_part)
@@ -263,6 +299,157 @@ class DocxParser(MulitMemoizeMixin):
         self.current_part = main_document_part
         self._parsed = self.parse(main_document_part.root_element)
 
+    def parse_begin_streaming(self, main_document_part):
+        '''
+        Convert the body of the document a chunk of top-level elements at a
+        time, so that the element tree of the whole body is never held in
+        memory.
+
+        If the document has numbering, the body is read twice. The first pass
+        records where each list starts and ends (see `_scan_body`). The second
+        converts the body, only ending a chunk where no list is open, because
+        a list needs to see all of its items (and whatever is nested between
+        them) at once. Without numbering there are no lists, and the body is
+        converted in a single pass.
+        '''
+        list_ends = {}
+        lowest_ilvl = None
+        if self.numbering_root is not None:
+            list_ends, lowest_ilvl = self._scan_body(main_document_part)
+
+        self.pre_processor = self._create_pre_processor()
+        self.footnote_id_to_content = self.load_footnotes(main_document_part)
+
+        self.current_part = main_document_part
+        self.page_width = None
+        parsed = []
+        chunk = []
+        open_until = -1
+        stream = main_document_part.stream
+        stream.seek(0)
+        elements = iter_body_children(stream, engine=self.xml_engine)
+        for index, el in enumerate(elements):
+            if self.page_width is None:
+                self.page_width = self._get_page_width(el)
+            chunk.append(el)
+            open_until = max(open_until, list_ends.get(index, index))
+            if open_until > index or len(chunk) < self.streaming_chunk_size:
+                continue
+            parsed.append(self._parse_body_chunk(chunk, lowest_ilvl))
+            chunk = []
+        if chunk:
+            parsed.append(self._parse_body_chunk(chunk, lowest_ilvl))
+        self._parsed = ''.join(parsed)
+
+    def _scan_body(self, main_document_part):
+        '''
+        Read through the body of the document without keeping its elements,
+        and return a dictionary mapping the index of each top-level element
+        that starts a list to the index of the last top-level element that is
+        part of that list, along with the lowest ilvl of any list item.
+
+        A list takes in everything from its first item to its last one. If
+        the last item isn't a list item the conversion comes across (it is a
+        heading, it has no content, or it is nested in something other than a
+        table) the list goes on until the next top-level list item, see
+        `_parse_list`.
+        '''
+        scanner = self._create_pre_processor()
+        list_starts = {}
+        list_ends = {}
+        # Whether the last item seen so far of each root level list ends it
+        ends_list = {}
+        # The indexes of the top-level elements that are list items
+        list_item_indexes = array('i')
+        ilvls = set()
+        last_index = -1
+        stream = main_document_part.stream
+        stream.seek(0)
+        elements = iter_body_children(stream, engine=self.xml_engine)
+        for index, el in enumerate(elements):
+            last_index = index
+            # Wrap the element the same way it is wrapped in the document, so
+            # that its list items are namespaced by the same number of tables.
+            body = self.xml_engine.element('body')
+            body.append(el)
+            for paragraph, num_id, ilvl in scanner.find_list_items(body):
+                list_starts.setdefault(num_id, index)
+                list_ends[num_id] = index
+                ilvls.add(int(ilvl))
+                if num_id.num_tables:
+                    continue
+                is_top_level_list_item = (
+                    paragraph is el and
+                    scanner.is_kept_list_item(paragraph, num_id, ilvl) and
+                    any(
+                        find_first(el, tag) is not None
+                        for tag in TAGS_CONTAINING_CONTENT
+                    )
+                )
+                ends_list[num_id] = is_top_level_list_item
+                if is_top_level_list_item and (
+                        not list_item_indexes or
+                        list_item_indexes[-1] != index):
+                    list_item_indexes.append(index)
+            el.clear()
+
+        last_index_by_start = {}
+        for num_id, start in list_starts.items():
+            end = list_ends[num_id]
+            if not ends_list.get(num_id, True):
+                position = bisect_right(list_item_indexes, end)
+                if position < len(list_item_indexes):
+                    end = list_item_indexes[position] - 1
+                else:
+                    end = last_index
+            last_index_by_start[start] = max(
+                last_index_by_start.get(start, start),
+                end,
+            )
+        lowest_ilvl = None
+        if ilvls:
+            lowest_ilvl = min(ilvls)
+        return last_index_by_start, lowest_ilvl
+
+    def _parse_body_chunk(self, elements, lowest_ilvl):
+        root = self.xml_engine.element('document')
+        body = self.xml_engine.sub_element(root, 'body')
+        for el in elements:
+            body.append(el)
+
+        self.pre_processor = self._create_pre_processor(
+            lowest_ilvl=lowest_ilvl,
+        )
+        self.pre_processor.perform_pre_processing(root)
+        parsed = self.parse(root)
+
+        # Drop everything that refers to the elements of this chunk
+        self.visited.clear()
+        self.styles_manager.clear_properties_for_elements()
+        for el in elements:
+            el.clear()
+        return parsed
+
+    @property
+    def tag_index(self):
+        '''
+        The TagIndex built by the pre-processor for the tree being parsed.
+        '''
+        if self.pre_processor is None:
+            # Nothing has been indexed yet, so every lookup walks the tree
+            return TagIndex()
+        return self.pre_processor.tag_index
+
+    def _create_pre_processor(self, **kwargs):
+        return self.pre_processor_class(
+            convert_root_level_upper_roman=self.convert_root_level_upper_roman,
+            styles=self.styles,
+            numbering_root=self.numbering_root,
+            numbering=self.numbering,
+            xml_engine=self.xml_engine,
+            **kwargs
+        )
+
     def parse(self, el):
         return self.parser.parse(el)
 
@@ -301,7 +488,7 @@ class DocxParser(MulitMemoizeMixin):
         return self.table_row(text)
 
     def parse_table_cell(self, el, text, stack):
-        v_merge = find_first(el, 'vMerge')
+        v_merge = self.tag_index.find_first(el, 'vMerge')
         if v_merge is not None and (
                 'restart' != v_merge.get('val', '')):
             return ''
@@ -329,7 +516,9 @@ class DocxParser(MulitMemoizeMixin):
         return parsed
 
     def get_list_style(self, num_id, ilvl):
-        return get_list_style(self.numbering_root, num_id, ilvl)
+        if self.numbering is None:
+            return None
+        return self.numbering.get_format(num_id, ilvl)
 
     def _build_list(self, el, text):
         # Get the list style for the pending list.
@@ -485,7 +674,7 @@ class DocxParser(MulitMemoizeMixin):
         if self.pre_processor.previous(next_el) is None:
             return False
         tag_is_inline_like = any(
-            self.memod_tree_op('has_descendant_with_tag', next_el, tag) for
+            self.pre_processor.has_descendant_with_tag(next_el, tag) for
             tag in inline_like_tags
         )
         if tag_is_inline_like:
@@ -550,12 +739,6 @@ class DocxParser(MulitMemoizeMixin):
         # Create the actual li element
         return self.list_element(parsed)
 
-    def _get_tcs_in_column(self, tbl, column_index):
-        return [
-            tc for tc in self.memod_tree_op('find_all', tbl, 'tc')
-            if self.pre_processor.column_index(tc) == column_index
-        ]
-
     def _get_rowspan(self, el, v_merge):
         restart_in_v_merge = False
         if v_merge is not None and 'val' in v_merge.attrib:
@@ -564,38 +747,15 @@ class DocxParser(MulitMemoizeMixin):
         if not restart_in_v_merge:
             return -1
 
-        current_row = self.pre_processor.row_index(el)
-        current_col = self.pre_processor.column_index(el)
-        rowspan = 1
-        result = -1
-        tbl = find_ancestor_with_tag(self.pre_processor, el, 'tbl')
-        # We only want table cells that have a higher row_index that is greater
-        # than the current_row and that are on the current_col
-        if tbl is None:
+        # The rows spanned by each cell are laid out on the grid of its table
+        # while pre-processing
+        rowspan = self.pre_processor.rowspan(el)
+        if rowspan is None or rowspan < 2:
             return -1
-
-        tcs = [
-            tc for tc in self.memod_tree_op(
-                '_get_tcs_in_column', tbl, current_col,
-            ) if self.pre_processor.row_index(tc) >= current_row
-        ]
-
-        def should_increment_rowspan(tc):
-            if not self.pre_processor.vmerge_continue(tc):
-                return False
-            return True
-
-        for tc in tcs:
-            if should_increment_rowspan(tc):
-                rowspan += 1
-            else:
-                rowspan = 1
-            if rowspan > 1:
-                result = rowspan
-        return result
+        return rowspan
 
     def get_colspan(self, el):
-        grid_span = find_first(el, 'gridSpan')
+        grid_span = self.tag_index.find_first(el, 'gridSpan')
         if grid_span is None:
             return ''
         return grid_span.attrib['val']
@@ -624,7 +784,7 @@ class DocxParser(MulitMemoizeMixin):
 
     def _get_image_id(self, el):
         # Drawings
-        blip = find_first(el, 'blip')
+        blip = self.tag_index.find_first(el, 'blip')
         if blip is not None:
             # On drawing tags the id is actually whatever is returned from the
             # embed attribute on the blip tag. Thanks a lot Microsoft.
@@ -633,7 +793,7 @@ class DocxParser(MulitMemoizeMixin):
                 r_id = blip.get('link')
             return r_id
         # Picts
-        imagedata = find_first(el, 'imagedata')
+        imagedata = self.tag_index.find_first(el, 'imagedata')
         if imagedata is not None:
             return imagedata.get('id')
 
@@ -656,7 +816,7 @@ class DocxParser(MulitMemoizeMixin):
                 '%dpx' % x,
                 '%dpx' % y,
             )
-        shape = find_first(el, 'shape')
+        shape = self.tag_index.find_first(el, 'shape')
         if shape is not None and shape.get('style') is not None:
             # If either of these are not set, rely on the method `image` to not
             # use either of them.
@@ -731,37 +891,17 @@ class DocxParser(MulitMemoizeMixin):
             stack,
         )
 
-        def get_properties_with_no_font_size():
-            # Only set paragraph_properties if properties has a size.
-            if not properties.size:
-                return
-            copied_el = copy.deepcopy(el)
-            rpr = find_first(copied_el, 'rPr')
-            if rpr is None:
-                return
-
-            size_tag = find_first(rpr, 'sz')
-            if size_tag is None:
-                return
-
-            rpr.remove(size_tag)
-
-            return self.styles_manager.get_resolved_properties_for_element(
-                copied_el,
-                stack,
-            )
-
-        paragraph_properties = get_properties_with_no_font_size()
+        # The size of the paragraph (the size the run inherits from its
+        # ancestors), which is only known if the run sets a size of its own.
+        inherited_size = self.styles_manager.get_inherited_size(el, stack)
 
         def is_local_size_smaller():
-            # If paragraph_properties is None then the size was not set
-            # (meaning it can't be bigger or smaller than the default for the
-            # paragraph, so early exit.
-            if paragraph_properties is None:
-                return False
-            if paragraph_properties.size is None:
+            # If inherited_size is None then the size was not set (meaning it
+            # can't be bigger or smaller than the default for the paragraph,
+            # so early exit.
+            if not properties.size or inherited_size is None:
                 return False
-            return properties.size < paragraph_properties.size
+            return properties.size < inherited_size
 
         styles_needing_application = []
 
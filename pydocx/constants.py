@@ -5,6 +5,20 @@ from __future__ import (
 )
 
 UPPER_ROMAN_TO_HEADING_VALUE = 'h2'
+# These are the styles for headers and what the html tag should be if we have
+# one.
+HEADING_TAGS_BY_STYLE_NAME = {
+    'heading 1': 'h1',
+    'heading 2': 'h2',
+    'heading 3': 'h3',
+    'heading 4': 'h4',
+    'heading 5': 'h5',
+    'heading 6': 'h6',
+    'heading 7': 'h6',
+    'heading 8': 'h6',
+    'heading 9': 'h6',
+    'heading 10': 'h6',
+}
 TAGS_CONTAINING_CONTENT = (
     't',
     'pict',
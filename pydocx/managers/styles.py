@@ -20,7 +20,7 @@ class StylesManager(object):
     def __init__(self, style_definitions_part=None):
         self.style_definitions_part = style_definitions_part
         if style_definitions_part:
-            self.styles = Styles.load(style_definitions_part.root_element)
+            self.styles = style_definitions_part.styles
         else:
             self.styles = Styles()
         self.properties_for_elements = {}
@@ -29,63 +29,35 @@ class StylesManager(object):
             'r': 'character',
         }
 
-    def save_properties_for_element(self, element, properties):
-        self.properties_for_elements[element] = properties
+    # The key of the properties resolved for an element in its frame of the
+    # parser's stack
+    resolved_properties_key = 'resolved_properties'
 
-    def _get_style_chain_stack(self, style_type, style_id):
+    def save_properties_for_element(self, element, properties, frame=None):
         '''
-        Given a style_type and style_id, return the hierarchy of styles ordered
-        ascending.
-
-        For example, given the following style specification:
-
-        styleA -> styleB
-        styleB -> styleC
-
-        If this method is called using style_id=styleA, the result will be:
-
-        styleA
-        styleB
-        styleC
+        Save the direct formatting `properties` of `element`. If `element` is
+        being parsed, `frame` is its frame of the parser's stack, and any
+        properties resolved for it so far are dropped.
         '''
-        visited_styles = set()
-        visited_styles.add(style_id)
-
-        styles = self.styles.get_styles_by_type(style_type)
-        base_style = styles.get(style_id)
-
-        style_stack = [base_style]
+        self.properties_for_elements[element] = properties
+        if frame is not None:
+            frame.pop(self.resolved_properties_key, None)
 
-        # Build up the stack of styles to merge together
-        current_style = base_style
-        while current_style:
-            if not current_style.parent_style:
-                # The current style doesn't have a parent style
-                break
-            if current_style.parent_style in visited_styles:
-                # Loop detected
-                break
-            style = styles.get(current_style.parent_style)
-            if not style:
-                # Style doesn't exist
-                break
-            visited_styles.add(style.style_id)
-            style_stack.append(style)
-            current_style = style
-        return style_stack
+    def clear_properties_for_elements(self):
+        self.properties_for_elements.clear()
 
     def _get_merged_style_chain(self, style_type, style_id):
         '''
-        Given a style type and style id, calculate the style chain stack and
-        return the merged properties between each style in the stack.
+        Given a style type and style id, return the merged properties between
+        each style in the style chain, which are compiled once when the styles
+        are loaded. The run properties of heading styles are left out, since
+        all the styling is done with the heading.
         '''
-        style_stack = self._get_style_chain_stack(style_type, style_id)
-
-        run_properties = {}
-        for style in reversed(style_stack):
-            if style and style.run_properties:
-                run_properties.update(dict(style.run_properties.items()))
-        return run_properties
+        return self.styles.get_merged_run_properties(
+            style_type,
+            style_id,
+            without_headings=True,
+        )
 
     def _resolve_properties_for_element(self, element):
         '''
@@ -108,26 +80,62 @@ class StylesManager(object):
         style_type = self.tag_to_style_type_map.get(element.tag)
         if properties and style_type:
             if properties.parent_style:
-                run_properties_dict = self._get_merged_style_chain(
+                run_properties = self._get_merged_style_chain(
                     style_type,
                     properties.parent_style,
                 )
-                properties_dict.update(run_properties_dict)
+                properties_dict.update(run_properties)
             if style_type == 'character':
                 properties_dict.update(dict(properties.items()))
         return properties_dict
 
+    def _get_resolved_properties_for_stack(self, stack):
+        '''
+        Return the properties resolved for the innermost element of `stack`.
+
+        The properties resolved for each element are kept in its frame of the
+        stack, so only the elements that were added to the stack since the
+        last call are resolved, each on top of the properties of its parent.
+        The returned dict is shared with the frame, and must not be changed.
+        '''
+        key = self.resolved_properties_key
+        index = len(stack)
+        properties = {}
+        while index > 0:
+            resolved = stack[index - 1].get(key)
+            if resolved is not None:
+                properties = resolved
+                break
+            index -= 1
+        for item in stack[index:]:
+            resolved = self._resolve_properties_for_element(item['element'])
+            if resolved:
+                properties = dict(properties)
+                properties.update(resolved)
+            item[key] = properties
+        return properties
+
     def get_resolved_properties_for_element(self, el, stack):
         '''
         Given an element and a stack of ancestors, calculate the properties at
         each level, merge the properties, and return the result.
         '''
-        properties = {}
-
-        for item in stack:
-            element = item['element']
-            properties.update(self._resolve_properties_for_element(element))
-
+        properties = dict(self._get_resolved_properties_for_stack(stack))
         properties.update(self._resolve_properties_for_element(el))
         run_properties = RunProperties(**properties)
         return run_properties
+
+    def get_inherited_size(self, el, stack):
+        '''
+        Given an element and a stack of ancestors, return the font size that
+        the element inherits from its ancestors, or None if the element
+        doesn't set a size of its own (or none is inherited).
+
+        The size is taken from the properties already resolved for the
+        ancestors, so nothing is resolved again.
+        '''
+        properties = self.properties_for_elements.get(el)
+        if properties is None or getattr(properties, 'sz', None) is None:
+            return None
+        inherited_properties = self._get_resolved_properties_for_stack(stack)
+        return RunProperties(sz=inherited_properties.get('sz')).size
@@ -43,7 +43,87 @@ class ChildTag(XmlField):
         self.attrname = attrname
 
 
-class XmlModel(object):
+def _create_child_parser(field):
+    '''
+    Return a function which parses the value of `field` from a child tag.
+    '''
+    attrname = field.attrname
+    default = field.default
+    field_type = field.type
+    if isinstance(field_type, type) and issubclass(field_type, XmlModel):
+        # The type may be an XmlModel, if so, construct a new instance using
+        # XmlModel.load
+        parse_value = field_type.load
+    elif callable(field_type):
+        # Or it could just be something that we can call
+        parse_value = field_type
+    else:
+        parse_value = None
+
+    # If attrname is set, then the value is an attribute on the child.
+    # Otherwise it's just the child.
+    if attrname:
+        if parse_value is None:
+            return lambda child: child.attrib.get(attrname, default)
+        return lambda child: parse_value(child.attrib.get(attrname, default))
+    if parse_value is None:
+        return lambda child: child
+    return parse_value
+
+
+class XmlModelType(type):
+    '''
+    Compiles the fields of each XmlModel once, when the class is created.
+
+    The fields are removed from the class and replaced by slots of the same
+    name. The model keeps each field name with its default (`_defaults`), the
+    attribute fields (`_attribute_fields`) and a mapping of each child tag
+    name to the field it sets and a function which parses its value
+    (`_child_parsers`).
+    '''
+
+    def __new__(mcs, name, bases, namespace):
+        fields = []
+        for field_name, field in list(namespace.items()):
+            if isinstance(field, XmlField):
+                fields.append((field_name, field))
+                del namespace[field_name]
+        namespace['__slots__'] = tuple(
+            field_name for field_name, _ in fields
+        ) + tuple(namespace.get('__slots__', ()))
+        cls = super(XmlModelType, mcs).__new__(mcs, name, bases, namespace)
+
+        inherited_fields = []
+        for base in reversed(cls.__mro__[1:]):
+            inherited_fields.extend(base.__dict__.get('_fields', ()))
+        cls._fields = tuple(inherited_fields + fields)
+        cls._defaults = tuple(
+            (field_name, field.default)
+            for field_name, field in cls._fields
+        )
+        cls._attribute_fields = tuple(
+            (field_name, field.name or field_name, field.default)
+            for field_name, field in cls._fields
+            if isinstance(field, Attribute)
+        )
+        # By default, the name is whatever the field name is, unless the tag
+        # definition specifies an override name
+        cls._child_parsers = dict(
+            (field.name or field_name, (
+                field_name,
+                _create_child_parser(field),
+            ))
+            for field_name, field in cls._fields
+            if isinstance(field, ChildTag)
+        )
+        return cls
+
+
+# Created by calling the metaclass, so that it applies on Python 2 and 3
+_XmlModelBase = XmlModelType(str('_XmlModelBase'), (object,), {})
+
+
+class XmlModel(_XmlModelBase):
     '''
     Xml models are defined by inheriting this class, and then specifying class
     variables to define the structure of the XML data.
@@ -65,10 +145,8 @@ class XmlModel(object):
     '''
 
     def __init__(self, **kwargs):
-        for field_name, field in self.__class__.__dict__.items():
-            if isinstance(field, XmlField):
-                value = kwargs.get(field_name, field.default)
-                setattr(self, field_name, value)
+        for field_name, default in self._defaults:
+            setattr(self, field_name, kwargs.get(field_name, default))
 
     def items(self):
         '''
@@ -76,80 +154,27 @@ class XmlModel(object):
         model, and yields back only those fields which have been set to a value
         that isn't the field's default.
         '''
-        for field_name, field in self.__class__.__dict__.items():
-            if isinstance(field, XmlField):
-                value = getattr(self, field_name, field.default)
-                if value != field.default:
-                    yield field_name, value
+        for field_name, default in self._defaults:
+            value = getattr(self, field_name, default)
+            if value != default:
+                yield field_name, value
 
     @classmethod
     def load(cls, element):
-        attribute_fields = {}
-        tag_fields = {}
-        # Enumerate the defined fields and separate them into attributes and
-        # tags
-        for field_name, field in cls.__dict__.items():
-            if isinstance(field, Attribute):
-                attribute_fields[field_name] = field
-            if isinstance(field, ChildTag):
-                tag_fields[field_name] = field
-
-        # Evaluate each of the attribute fields against the given element
         kwargs = {}
-        for field_name, field in attribute_fields.items():
-            attr_name = field_name
-            if field.name is not None:
-                attr_name = field.name
-            value = element.attrib.get(attr_name, field.default)
-            kwargs[field_name] = value
+        # Evaluate each of the attribute fields against the given element
+        attrib = element.attrib
+        for field_name, attr_name, default in cls._attribute_fields:
+            kwargs[field_name] = attrib.get(attr_name, default)
 
         # Child tag fields may specify a handler/type, which is responsible for
         # parsing the child tag
-        tag_name_to_field_name = {}
-        child_handlers = {}
-
-        def create_child_handler(field):
-            def child_handler(child):
-                # If attrname is set, then the value is an attribute on the
-                # child
-                if field.attrname:
-                    value = child.attrib.get(field.attrname, field.default)
-                else:
-                    # Otherwise it's just the child
-                    value = child
-
-                # The type may be an XmlModel, if so, construct a new instance
-                # using XmlModel.load
-                if field.type and issubclass(field.type, XmlModel):
-                    return field.type.load(value)
-                # Or it could just be something that we can call
-                elif callable(field.type):
-                    return field.type(value)
-                else:
-                    return value
-            return child_handler
-
-        # Evaluate the child tags
-        for field_name, field in tag_fields.items():
-            # By default, the name is whatever the field name is, unless the
-            # tag definition specifies an override name
-            tag_name = field_name
-            if field.name is not None:
-                tag_name = field.name
-
-            # Based on the tag name, we need to know what the field name is
-            tag_name_to_field_name[tag_name] = field_name
-            # Save the handler
-            child_handlers[tag_name] = create_child_handler(field)
-
-        # Process each child
+        child_parsers = cls._child_parsers
         for child in element:
             # Does this child have a corresponding field?
-            field_name = tag_name_to_field_name.get(child.tag, None)
-            if field_name:
-                # Execute the handler
-                handler = child_handlers.get(child.tag, None)
-                if callable(handler):
-                    kwargs[field_name] = handler(child)
+            child_parser = child_parsers.get(child.tag)
+            if child_parser is not None:
+                field_name, parse = child_parser
+                kwargs[field_name] = parse(child)
         # Create a new instance using the values we've calculated
         return cls(**kwargs)
@@ -0,0 +1,100 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from pydocx.models import XmlModel, ChildTag, Attribute
+
+
+class Level(XmlModel):
+    level_id = Attribute(name='ilvl', default='')
+    start = ChildTag(attrname='val')
+    num_format = ChildTag(name='numFmt', attrname='val')
+
+
+class LevelOverride(XmlModel):
+    level_id = Attribute(name='ilvl', default='')
+    start_override = ChildTag(name='startOverride', attrname='val')
+    level = ChildTag(type=Level, name='lvl')
+
+
+class Numbering(object):
+    '''
+    The list formats defined by a numbering part, compiled into a mapping of
+    `(num_id, ilvl)` to the Level that applies to it.
+
+    Each num refers to an abstractNum, which defines its levels. A num may
+    override any of those levels with a lvlOverride, either replacing the
+    level entirely or only restarting its numbering with a startOverride.
+    '''
+
+    def __init__(self, levels=None):
+        if levels is None:
+            levels = {}
+        self.levels = levels
+
+    @staticmethod
+    def load(root):
+        abstract_levels = {}
+        nums = []
+        for element in root:
+            if element.tag == 'abstractNum':
+                abstract_num_id = element.attrib.get('abstractNumId')
+                levels = abstract_levels.setdefault(abstract_num_id, {})
+                for child in element:
+                    if child.tag != 'lvl':
+                        continue
+                    level = Level.load(child)
+                    # The first level that defines a format is the one used
+                    if level.num_format is None:
+                        continue
+                    levels.setdefault(level.level_id, level)
+            elif element.tag == 'num':
+                nums.append(element)
+
+        levels = {}
+        for element in nums:
+            num_id = element.attrib.get('numId')
+            abstract_num_id = None
+            overrides = []
+            for child in element:
+                if child.tag == 'abstractNumId':
+                    abstract_num_id = child.attrib.get('val')
+                elif child.tag == 'lvlOverride':
+                    overrides.append(LevelOverride.load(child))
+            num_levels = dict(abstract_levels.get(abstract_num_id, {}))
+            for override in overrides:
+                num_levels[override.level_id] = Numbering._apply_override(
+                    num_levels.get(override.level_id),
+                    override,
+                )
+            for ilvl, level in num_levels.items():
+                if level is not None:
+                    levels.setdefault((num_id, ilvl), level)
+        return Numbering(levels)
+
+    @staticmethod
+    def _apply_override(level, override):
+        if override.level is not None and override.level.num_format:
+            level = override.level
+        if override.start_override is None or level is None:
+            return level
+        return Level(
+            level_id=level.level_id,
+            start=override.start_override,
+            num_format=level.num_format,
+        )
+
+    def get_level(self, num_id, ilvl):
+        return self.levels.get((num_id, ilvl))
+
+    def get_format(self, num_id, ilvl):
+        '''
+        Return the numFmt of level `ilvl` of the list `num_id`, or None if
+        there isn't one.
+        '''
+        level = self.levels.get((num_id, ilvl))
+        if level is None:
+            return None
+        return level.num_format
@@ -6,6 +6,7 @@ from __future__ import (
 
 from collections import defaultdict
 
+from pydocx.constants import HEADING_TAGS_BY_STYLE_NAME
 from pydocx.models import XmlModel, ChildTag, Attribute
 from pydocx.types import OnOff, Underline
 
@@ -51,6 +52,17 @@ class Style(XmlModel):
 
 
 class Styles(object):
+    '''
+    The styles defined by a styles part, by type and id.
+
+    The run properties of each style are merged with those of the styles it
+    is based on when the styles are loaded, so looking up the properties of a
+    style chain doesn't walk it again. The chains are also merged without the
+    run properties of heading styles, which are left out when converting
+    since headings are styled by their tag. Styles are shared between
+    documents (see `SharedPartCache`), so nothing here changes once loaded.
+    '''
+
     def __init__(self, styles=None):
         if styles is None:
             styles = []
@@ -59,6 +71,39 @@ class Styles(object):
         for style in self.styles:
             styles_by_type[style.style_type][style.style_id] = style
         self.styles_by_type = dict(styles_by_type)
+        self.merged_run_properties = self._merge_style_chains()
+        heading_styles = [
+            style for style in self.styles
+            if style.run_properties is not None and
+            style.name.lower() in HEADING_TAGS_BY_STYLE_NAME
+        ]
+        if heading_styles:
+            self.merged_run_properties_without_headings = (
+                self._merge_style_chains(excluded_styles=heading_styles)
+            )
+        else:
+            self.merged_run_properties_without_headings = (
+                self.merged_run_properties
+            )
+
+    def _merge_style_chains(self, excluded_styles=()):
+        excluded_style_ids = set(id(style) for style in excluded_styles)
+        merged_run_properties = {}
+        for style_type, styles in self.styles_by_type.items():
+            for style_id in styles:
+                run_properties = {}
+                style_chain = self.get_style_chain(style_type, style_id)
+                for style in reversed(style_chain):
+                    if id(style) in excluded_style_ids:
+                        continue
+                    if style.run_properties:
+                        run_properties.update(style.run_properties.items())
+                # Stored as a tuple of items so the shared result can't be
+                # changed by the callers
+                merged_run_properties[(style_type, style_id)] = tuple(
+                    run_properties.items(),
+                )
+        return merged_run_properties
 
     @staticmethod
     def load(root):
@@ -71,3 +116,57 @@ class Styles(object):
 
     def get_styles_by_type(self, style_type):
         return self.styles_by_type.get(style_type, {})
+
+    def get_style_chain(self, style_type, style_id):
+        '''
+        Given a style_type and style_id, return the hierarchy of styles ordered
+        ascending.
+
+        For example, given the following style specification:
+
+        styleA -> styleB
+        styleB -> styleC
+
+        If this method is called using style_id=styleA, the result will be:
+
+        styleA
+        styleB
+        styleC
+
+        The chain stops at the first style that doesn't exist, or that is
+        already in the chain.
+        '''
+        styles = self.get_styles_by_type(style_type)
+        style = styles.get(style_id)
+        if style is None:
+            return []
+        visited_styles = set([style_id])
+        style_chain = [style]
+        while style.parent_style:
+            if style.parent_style in visited_styles:
+                # Loop detected
+                break
+            style = styles.get(style.parent_style)
+            if style is None:
+                # Style doesn't exist
+                break
+            visited_styles.add(style.style_id)
+            style_chain.append(style)
+        return style_chain
+
+    def get_merged_run_properties(
+        self,
+        style_type,
+        style_id,
+        without_headings=False,
+    ):
+        '''
+        Return the run properties of the style chain starting at `style_id`,
+        merged so that each style takes precedence over the styles it is based
+        on, as a tuple of `(name, value)` items. If `without_headings` is set,
+        the run properties of heading styles are left out.
+        '''
+        merged_run_properties = self.merged_run_properties
+        if without_headings:
+            merged_run_properties = self.merged_run_properties_without_headings
+        return merged_run_properties.get((style_type, style_id), ())
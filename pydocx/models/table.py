@@ -0,0 +1,107 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from pydocx.models import XmlModel, ChildTag
+
+
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class TableRowProperties(XmlModel):
+    grid_before = ChildTag(name='gridBefore', attrname='val')
+
+
+class TableCellProperties(XmlModel):
+    grid_span = ChildTag(name='gridSpan', attrname='val')
+    v_merge = ChildTag(name='vMerge')
+
+    @property
+    def vmerge_restart(self):
+        return (
+            self.v_merge is not None and
+            self.v_merge.get('val', '') == 'restart'
+        )
+
+    @property
+    def vmerge_continue(self):
+        # A vMerge without a val continues the merge
+        return (
+            self.v_merge is not None and
+            self.v_merge.get('val', 'continue') == 'continue'
+        )
+
+
+class TableGrid(object):
+    '''
+    The cells of a table laid out on its grid: the grid column that each cell
+    starts in, which accounts for the columns skipped by gridBefore and the
+    columns spanned by the cells before it, and the number of rows that each
+    cell spans.
+
+    A cell that restarts a vertical merge spans its own row and each of the
+    rows directly below it whose cell starting in the same grid column
+    continues the merge. Only the rows and cells that are direct children of
+    the table are laid out, so the cells of nested tables aren't included.
+    '''
+
+    def __init__(self, grid_columns=None, rowspans=None):
+        if grid_columns is None:
+            grid_columns = {}
+        if rowspans is None:
+            rowspans = {}
+        self.grid_columns = grid_columns
+        self.rowspans = rowspans
+
+    @staticmethod
+    def load(table):
+        grid_columns = {}
+        rowspans = {}
+        # The cell that restarted the merge open in each grid column
+        open_merges = {}
+        for tr in table:
+            if tr.tag != 'tr':
+                continue
+            grid_column = 0
+            continued_merges = {}
+            for tc in tr:
+                if tc.tag == 'trPr':
+                    properties = TableRowProperties.load(tc)
+                    grid_column += _to_int(properties.grid_before, 0)
+                    continue
+                if tc.tag != 'tc':
+                    continue
+                properties = TableCellProperties()
+                for child in tc:
+                    if child.tag == 'tcPr':
+                        properties = TableCellProperties.load(child)
+                        break
+                grid_columns[tc] = grid_column
+                rowspans[tc] = 1
+                if properties.vmerge_restart:
+                    continued_merges[grid_column] = tc
+                elif properties.vmerge_continue:
+                    restart = open_merges.get(grid_column)
+                    if restart is not None:
+                        rowspans[restart] += 1
+                        continued_merges[grid_column] = restart
+                grid_column += max(_to_int(properties.grid_span, 1), 1)
+            # A merge ends at the first row that doesn't continue it
+            open_merges = continued_merges
+        return TableGrid(grid_columns, rowspans)
+
+    def grid_column(self, tc):
+        return self.grid_columns.get(tc)
+
+    def rowspan(self, tc):
+        '''
+        Return the number of rows that `tc` spans, or None if it isn't one of
+        the cells of the table.
+        '''
+        return self.rowspans.get(tc)
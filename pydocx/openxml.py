@@ -4,13 +4,98 @@ from __future__ import (
     unicode_literals,
 )
 
+import hashlib
 import posixpath
+import threading
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
+from pydocx.exceptions import MalformedDocxException
 from pydocx.packaging import ZipPackage
+from pydocx.util.memoize import LRUCache
 from pydocx.util.xml import parse_xml_from_string
 
 
+class SharedPart(object):
+    '''
+    The parsed form of a part's content, which may be shared between every
+    document that contains a byte-identical copy of that part.
+
+    `root_element` and the loaded objects must be treated as read-only.
+    '''
+
+    def __init__(self, digest, root_element):
+        self.digest = digest
+        self.root_element = root_element
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def get_loaded(self, name, load):
+        '''
+        Return the object previously stored under `name`, calling `load` to
+        create it the first time.
+        '''
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded[name] = load()
+            return self._loaded[name]
+
+
+class SharedPartCache(object):
+    '''
+    A size-bounded, process-wide LRU cache of parsed parts.
+
+    Entries are keyed by the CRC-32 and uncompressed size recorded for the
+    part in the ZIP central directory, and a hit is only returned once a
+    SHA-1 of the part data confirms it, so a CRC collision can never return
+    the wrong part.
+
+    The cache is opt-in, and only consulted for part types that set
+    `cacheable`:
+
+        OpenXmlPart.shared_part_cache = SharedPartCache(max_entries=64)
+    '''
+
+    def __init__(self, max_entries=64):
+        self.entries = LRUCache(max_size=max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, member, data, parse, engine_name=None):
+        '''
+        Return the SharedPart for `data`, the content of the archive member
+        `member` (a ZipInfo), calling `parse` with `data` on a miss. Parts
+        parsed by different XML engines are cached separately.
+        '''
+        key = (member.CRC, member.file_size, engine_name)
+        digest = hashlib.sha1(data).digest()
+        with self._lock:
+            shared_part = self.entries.get(key)
+            if shared_part is not None and shared_part.digest == digest:
+                self.hits += 1
+                return shared_part
+            self.misses += 1
+        shared_part = SharedPart(digest, parse(data))
+        with self._lock:
+            self.entries[key] = shared_part
+        return shared_part
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.entries.evictions,
+                entries=len(self.entries),
+                max_entries=self.entries.max_size,
+            )
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+
 class OpenXmlPartContainer(object):
     '''
     Represents a container for other OpenXmlParts that are associated with a
@@ -21,16 +106,19 @@ class OpenXmlPartContainer(object):
 
     child_part_types = []
 
+    __slots__ = ('_parts', 'parts_of_type')
+
     def __init__(self):
-        self.external_relationships = {}
-        self.hyperlink_relationships = {}
+        # Both are created when the parts are first loaded, so parts that
+        # never contain other parts (such as images) don't carry them.
         self._parts = None
-        self.parts_of_type = defaultdict(list)
+        self.parts_of_type = None
 
     @property
     def parts(self):
         if self._parts is None:
             self._parts = {}
+            self.parts_of_type = defaultdict(list)
             self._load_parts()
         return self._parts
 
@@ -94,6 +182,37 @@ class OpenXmlPartContainer(object):
             self.parts[relationship_id] = part
         self.parts_of_type[part.relationship_type].append(part)
 
+    def get_parts_to_prefetch(self):
+        self._ensure_parts_are_loaded()
+        parts = []
+        for child_part_type in self.child_part_types:
+            parts.extend(self.parts_of_type[child_part_type.relationship_type])
+        return parts
+
+    def prefetch_parts(self, max_workers, parts=None):
+        '''
+        Read, and for XML parts parse, the parts of this container on a pool
+        of `max_workers` threads instead of lazily one after the other. zlib
+        and the XML parser spend much of their time outside of the GIL, so
+        this cuts the wall-clock time of loading large documents.
+
+        `parts` defaults to `get_parts_to_prefetch()`.
+        '''
+        if parts is None:
+            parts = self.get_parts_to_prefetch()
+        if not parts:
+            return
+        pool = ThreadPool(min(max_workers, len(parts)))
+        try:
+            pool.map(_preload_part, parts)
+        finally:
+            pool.close()
+            pool.join()
+
+
+def _preload_part(part):
+    part.preload()
+
 
 class OpenXmlPart(OpenXmlPartContainer):
     '''
@@ -103,6 +222,14 @@ class OpenXmlPart(OpenXmlPartContainer):
     See also: http://msdn.microsoft.com/en-us/library/documentformat.openxml.packaging.openxmlpart%28v=office.14%29.aspx  # noqa
     '''
 
+    # Part types whose content is commonly repeated across documents (such as
+    # the styles from a template) set this to share their parsed form through
+    # `shared_part_cache`, when it is enabled.
+    cacheable = False
+    shared_part_cache = None
+
+    __slots__ = ('_root_element', '_shared_part', 'uri', 'open_xml_package')
+
     def __init__(
         self,
         uri,
@@ -110,15 +237,73 @@ class OpenXmlPart(OpenXmlPartContainer):
     ):
         super(OpenXmlPart, self).__init__()
         self._root_element = None
+        self._shared_part = None
         self.uri = uri
         self.open_xml_package = open_xml_package
 
     @property
     def root_element(self):
         if self._root_element is None:
-            self._root_element = parse_xml_from_string(self.stream.read())
+            self._root_element = self._load_root_element()
         return self._root_element
 
+    def _load_root_element(self):
+        data = self.stream.read()
+        package = self.open_xml_package.package
+        engine = package.xml_engine
+
+        def parse(data):
+            return parse_xml_from_string(data, engine=engine)
+
+        cache = self.shared_part_cache
+        if self.cacheable and cache is not None:
+            member = package.get_member_info(self.uri)
+            if member is not None:
+                self._shared_part = cache.get(
+                    member,
+                    data,
+                    parse,
+                    engine_name=engine.name,
+                )
+                return self._shared_part.root_element
+        return parse(data)
+
+    def get_loaded(self, name, load):
+        '''
+        Return the result of calling `load` with this part's root element. If
+        the part came out of the `shared_part_cache`, the result is stored
+        under `name` and shared along with the root element.
+        '''
+        root_element = self.root_element
+        if self._shared_part is not None:
+            return self._shared_part.get_loaded(
+                name,
+                lambda: load(root_element),
+            )
+        return load(root_element)
+
+    def get_parts_to_prefetch(self):
+        parts = super(OpenXmlPart, self).get_parts_to_prefetch()
+        return [self] + parts
+
+    def preload(self):
+        '''
+        Load the part ahead of when it is needed. This may be called from a
+        worker thread, see `OpenXmlPartContainer.prefetch_parts`.
+        '''
+        if not self.open_xml_package.package.part_exists(self.uri):
+            # External parts have no data
+            return
+        # Problems are left for whoever actually needs the part to report
+        try:
+            stream = self.stream
+        except MalformedDocxException:
+            return
+        try:
+            self.root_element
+        except MalformedDocxException:
+            stream.seek(0)
+
     @property
     def package_part(self):
         return self.open_xml_package.package.get_part(self.uri)
@@ -132,9 +317,13 @@ class OpenXmlPackage(OpenXmlPartContainer):
     '''
     Creates a ZipPackage and manages package-level OpenXmlParts.
 
+    Any additional keyword arguments are passed through to the ZipPackage.
+
     See also: http://msdn.microsoft.com/en-us/library/documentformat.openxml.packaging.openxmlpackage%28v=office.14%29.aspx  # noqa
     '''
 
-    def __init__(self, path):
+    __slots__ = ('package',)
+
+    def __init__(self, path, **package_options):
         super(OpenXmlPackage, self).__init__()
-        self.package = ZipPackage(path=path)
+        self.package = ZipPackage(path=path, **package_options)
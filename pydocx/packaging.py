@@ -1,21 +1,39 @@
 from __future__ import (
     absolute_import,
+    division,
     print_function,
     unicode_literals,
 )
 
 import posixpath
+import threading
 import zipfile
-from collections import defaultdict
+import zlib
 try:
     from cString import StringIO
     BytesIO = StringIO
 except ImportError:
     from io import BytesIO
-from xml.etree import cElementTree
 
 from pydocx.exceptions import MalformedDocxException
-from pydocx.util.xml import xml_tag_split, XmlNamespaceManager
+from pydocx.util.buffer import (
+    HAS_MEMORYVIEW,
+    MemoryViewReader,
+    is_buffer,
+    is_seekable,
+    map_file,
+    spool,
+)
+from pydocx.util.zip import (
+    INFLATE_CHUNK_SIZE,
+    can_read_member_from_buffer,
+    iter_member_from_buffer,
+)
+from pydocx.util.xml import (
+    get_xml_engine,
+    xml_tag_split,
+    XmlNamespaceManager,
+)
 
 
 class PackageRelationship(object):
@@ -42,6 +60,14 @@ class PackageRelationship(object):
     XML_ATTR_TARGET = 'Target'
     XML_ATTR_TYPE = 'Type'
 
+    __slots__ = (
+        'source_uri',
+        'target_uri',
+        'target_mode',
+        'relationship_type',
+        'relationship_id',
+    )
+
     def __init__(
         self,
         source_uri,
@@ -64,30 +90,81 @@ class PackageRelationship(object):
         return self.target_mode == PackageRelationship.TARGET_MODE_EXTERNAL
 
 
+class PackageRelationshipIndex(object):
+    '''
+    Holds the relationships of a package and of all of its parts.
+
+    The lookups live in package-wide dictionaries keyed by the source uri
+    instead of in dictionaries owned by every source, so wrapping a part that
+    has few or no relationships (such as an image) costs no more than its
+    slots.
+    '''
+
+    __slots__ = ('relationships', 'relationships_by_type', '_values')
+
+    def __init__(self):
+        # source uri -> {relationship id: relationship}. A source is present
+        # once its relationships have been loaded.
+        self.relationships = {}
+        # (source uri, relationship type) -> [relationship]
+        self.relationships_by_type = {}
+        self._values = {}
+
+    def intern(self, value):
+        '''
+        Return a single shared copy of a value that is repeated across many
+        relationships, such as a relationship type or target mode.
+        '''
+        if value is None:
+            return value
+        return self._values.setdefault(value, value)
+
+    def add(self, relationship):
+        source_uri = relationship.source_uri
+        if relationship.relationship_id:
+            relationships = self.relationships[source_uri]
+            relationships[relationship.relationship_id] = relationship
+        key = (source_uri, relationship.relationship_type)
+        relationships_by_type = self.relationships_by_type.get(key)
+        if relationships_by_type is None:
+            relationships_by_type = self.relationships_by_type[key] = []
+        relationships_by_type.append(relationship)
+
+    def get_relationships_by_type(self, source_uri, relationship_type):
+        key = (source_uri, relationship_type)
+        return list(self.relationships_by_type.get(key, ()))
+
+
 class PackageRelationshipManager(object):
     '''
     An internal class used by ZipPackage and ZipPackagePart to abstract the
-    package and part-level relationship management.
+    package and part-level relationship management. The relationships
+    themselves are stored in the package's PackageRelationshipIndex.
     '''
 
-    def __init__(self):
-        super(PackageRelationshipManager, self).__init__()
-        self._relationships = None
-        self.relationships_by_type = defaultdict(list)
+    __slots__ = ()
+
+    def get_relationship_index(self):
+        return self.get_part_container().relationship_index
 
     @property
     def relationships(self):
-        if self._relationships is None:
-            self._relationships = {}
+        index = self.get_relationship_index()
+        relationships = index.relationships.get(self.uri)
+        if relationships is None:
+            relationships = index.relationships[self.uri] = {}
             self._load_relationships()
-        return self._relationships
+        return relationships
 
     def _ensure_relationships_are_loaded(self):
         return self.relationships
 
     def get_relationships_by_type(self, relationship_type):
         self._ensure_relationships_are_loaded()
-        return list(self.relationships_by_type[relationship_type])
+        return self.get_relationship_index().get_relationships_by_type(
+            self.uri,
+            relationship_type,
+        )
 
     def get_relationship(self, relationship_id):
         return self.relationships[relationship_id]
@@ -107,9 +184,7 @@ class PackageRelationshipManager(object):
             relationship_type=relationship_type,
             relationship_id=relationship_id,
         )
-        if relationship_id:
-            self.relationships[relationship_id] = relationship
-        self.relationships_by_type[relationship_type].append(relationship)
+        self.get_relationship_index().add(relationship)
 
     def get_part_container(self):
         raise NotImplementedError
@@ -118,17 +193,22 @@ class PackageRelationshipManager(object):
         part_container = self.get_part_container()
         if not part_container.part_exists(self.relationship_uri):
             return
+        index = self.get_relationship_index()
         manager = XmlNamespaceManager()
         manager.add_namespace(PackageRelationship.namespace)
         stream = part_container.get_part(self.relationship_uri).stream
-        root = cElementTree.fromstring(stream.read())
+        root = part_container.xml_engine.fromstring(stream.read())
         for node in manager.iterate_children(root):
             _, tag = xml_tag_split(node.tag)
             if tag != PackageRelationship.XML_TAG_NAME:
                 continue
             relationship_id = node.get(PackageRelationship.XML_ATTR_ID)
-            relationship_type = node.get(PackageRelationship.XML_ATTR_TYPE)
-            target_mode = node.get(PackageRelationship.XML_ATTR_TARGETMODE)
+            relationship_type = index.intern(
+                node.get(PackageRelationship.XML_ATTR_TYPE),
+            )
+            target_mode = index.intern(
+                node.get(PackageRelationship.XML_ATTR_TARGETMODE),
+            )
             target_uri = node.get(PackageRelationship.XML_ATTR_TARGET)
             self.create_relationship(
                 target_uri=target_uri,
@@ -145,6 +225,8 @@ class ZipPackagePart(PackageRelationshipManager):
     See also: http://msdn.microsoft.com/en-us/library/system.io.packaging.zippackagepart.aspx  # noqa
     '''
 
+    __slots__ = ('uri', 'package', 'relationship_uri')
+
     def __init__(self, uri, package):
         super(ZipPackagePart, self).__init__()
         self.uri = uri
@@ -164,7 +246,7 @@ class ZipPackagePart(PackageRelationshipManager):
 
     @property
     def stream(self):
-        return self.package.streams[self.uri]
+        return self.package.get_stream(self.uri)
 
 
 class ZipPackage(PackageRelationshipManager):
@@ -172,15 +254,65 @@ class ZipPackage(PackageRelationshipManager):
     Represents a container that can that can store multiple data objects using
     a ZIP archive as a data store.
 
+    `path` may be a filesystem path, the archive itself as bytes, a bytearray
+    or a memoryview, or a file-like object. On python 2, where bytes is str, a
+    string is the archive itself if it starts with a ZIP signature and a path
+    otherwise (see `is_buffer`). In-memory archives are read without being
+    copied, except on python 2.6 which has no memoryview and copies them into
+    a BytesIO. Non-seekable streams are spooled (in memory, or to a temporary
+    file if they are large) the first time the archive is opened.
+
+    If `use_mmap` is set and `path` refers to a file on disk, the archive is
+    memory mapped instead of being read through buffered file I/O. Stored
+    members are then exposed as zero-copy memoryview slices of the mapping
+    (see `MemoryViewReader.getbuffer`) and deflated members are inflated
+    straight out of it.
+
+    Members are inflated in bounded chunks, and the amount of inflated data
+    can be limited with `max_member_size` (uncompressed bytes for any single
+    member), `max_total_size` (uncompressed bytes across all members) and
+    `max_compression_ratio` (uncompressed to compressed size of a member).
+    MalformedDocxException is raised as soon as a limit is exceeded. None
+    disables a limit.
+
+    `xml_engine` names the engine used to parse the XML parts, see
+    `pydocx.util.xml.get_xml_engine`.
+
     See also: http://msdn.microsoft.com/en-us/library/system.io.packaging.zippackage.aspx  # noqa
     '''
 
-    def __init__(self, path):
+    def __init__(
+        self,
+        path,
+        use_mmap=False,
+        max_member_size=None,
+        max_total_size=None,
+        max_compression_ratio=None,
+        xml_engine=None,
+    ):
         super(ZipPackage, self).__init__()
         self.path = path
+        self.use_mmap = use_mmap
+        self.max_member_size = max_member_size
+        self.max_total_size = max_total_size
+        self.max_compression_ratio = max_compression_ratio
+        self.xml_engine = get_xml_engine(xml_engine)
         self.streams = {}
         self.uri = '/'
+        self.relationship_index = PackageRelationshipIndex()
         self._parts = None
+        self._zip_file = None
+        self._zip_members = {}
+        self.loaded_member_count = 0
+        self.inflated_size = 0
+        # Parts may be read from several threads at once, see
+        # OpenXmlPartContainer.prefetch_parts
+        self._lock = threading.Lock()
+        # A lock per archive member, held while the member is inflated
+        self._member_locks = {}
+        self._spooled_input = None
+        self._mapping = None
+        self._buffer_reader = None
         self.relationship_uri = ZipPackagePart.get_relationship_part_uri(
             self.uri,
         )
@@ -188,19 +320,177 @@ class ZipPackage(PackageRelationshipManager):
     def _load_parts(self):
         if self.path is None:
             return
+        # Only the central directory is read here. Parts are wrapped the first
+        # time they are looked up (normally while following relationships),
+        # and the member data itself is decompressed the first time the part
+        # stream is requested.
+        for member in self._get_zip_file().infolist():
+            self._zip_members[self.uri + member.filename] = member
+
+    def _get_input(self):
+        if hasattr(self.path, 'read') and not is_seekable(self.path):
+            if self._spooled_input is None:
+                self._spooled_input = spool(self.path)
+            return self._spooled_input
+        return self.path
+
+    def _get_zip_file(self):
+        with self._lock:
+            return self._open_zip_file()
+
+    def _open_zip_file(self):
+        if self._zip_file is None:
+            source = self._get_input()
+            if is_buffer(source) and not HAS_MEMORYVIEW:
+                source = BytesIO(bytes(source))
+            elif is_buffer(source):
+                self._buffer_reader = MemoryViewReader(source)
+                source = self._buffer_reader
+            elif self.use_mmap:
+                self._mapping = map_file(source)
+                if self._mapping is not None:
+                    self._buffer_reader = MemoryViewReader(self._mapping)
+                    source = self._buffer_reader
+            try:
+                self._zip_file = zipfile.ZipFile(source)
+            except zipfile.BadZipfile:
+                raise MalformedDocxException()
+        return self._zip_file
+
+    def _read_member(self, uri):
+        member = self._zip_members[uri]
+        # Reject members whose declared size is already over budget before
+        # inflating anything. The declared size can't be trusted though, so
+        # the limits are enforced again on the data as it is inflated.
+        declared_size = member.file_size
+        with self._lock:
+            self._check_size_limits(uri, member, declared_size, declared_size)
+        chunks = []
+        member_size = 0
+        for chunk in self._iter_member_chunks(uri, member):
+            member_size += len(chunk)
+            with self._lock:
+                self._check_size_limits(uri, member, member_size, len(chunk))
+                self.inflated_size += len(chunk)
+            chunks.append(chunk)
+        if len(chunks) == 1:
+            # Avoid copying stored members that are views of the input
+            return chunks[0]
+        return b''.join(chunks)
+
+    def _iter_member_chunks(self, uri, member):
+        zip_file = self._get_zip_file()
+        if (
+                self._buffer_reader is not None and
+                can_read_member_from_buffer(member)):
+            return iter_member_from_buffer(
+                self._buffer_reader.getbuffer(),
+                member,
+            )
+        return self._iter_zip_file_member_chunks(zip_file, uri, member)
+
+    def _iter_zip_file_member_chunks(self, zip_file, uri, member):
         try:
-            f = zipfile.ZipFile(self.path)
-        except zipfile.BadZipfile:
-            raise MalformedDocxException()
-        try:
-            uris = f.namelist()
-            for uri in uris:
-                data = f.read(uri)
-                self.streams[self.uri + uri] = BytesIO(data)
-        finally:
-            f.close()
-        for uri in self.streams:
-            self.create_part(uri)
+            f = zip_file.open(member)
+            try:
+                while True:
+                    chunk = f.read(INFLATE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                f.close()
+        except (zipfile.BadZipfile, zlib.error):
+            raise MalformedDocxException(
+                'Unable to read "{uri}" from the package'.format(uri=uri),
+            )
+
+    def _check_size_limits(self, uri, member, member_size, chunk_size):
+        if self.max_member_size is not None:
+            if member_size > self.max_member_size:
+                raise MalformedDocxException(
+                    '"{uri}" is larger than {limit} bytes'.format(
+                        uri=uri,
+                        limit=self.max_member_size,
+                    )
+                )
+        if self.max_total_size is not None:
+            if self.inflated_size + chunk_size > self.max_total_size:
+                raise MalformedDocxException(
+                    'The package is larger than {limit} bytes'.format(
+                        limit=self.max_total_size,
+                    )
+                )
+        if self.max_compression_ratio is not None:
+            ratio = member_size / max(member.compress_size, 1)
+            if ratio > self.max_compression_ratio:
+                raise MalformedDocxException(
+                    '"{uri}" exceeds the compression ratio limit'.format(
+                        uri=uri,
+                    )
+                )
+
+    def get_member_info(self, uri):
+        '''
+        Return the ZipInfo from the central directory for the part at `uri`,
+        or None if the part is not backed by an archive member.
+        '''
+        self._ensure_parts_are_loaded()
+        return self._zip_members.get(uri)
+
+    def get_stream(self, uri):
+        '''
+        Return the data stream for the part at `uri`, decompressing the
+        underlying archive member if this is the first time it is requested.
+        '''
+        stream = self.streams.get(uri)
+        if stream is not None:
+            return stream
+        # Only one thread inflates a member. Any other thread asking for it in
+        # the meantime waits for that stream instead of inflating it again.
+        with self._get_member_lock(uri):
+            stream = self.streams.get(uri)
+            if stream is not None:
+                return stream
+            data = self._read_member(uri)
+            if isinstance(data, bytes):
+                stream = BytesIO(data)
+            else:
+                # A view of the input, see `iter_member_from_buffer`
+                stream = MemoryViewReader(data)
+            with self._lock:
+                self.streams[uri] = stream
+                self.loaded_member_count += 1
+        return stream
+
+    def _get_member_lock(self, uri):
+        with self._lock:
+            lock = self._member_locks.get(uri)
+            if lock is None:
+                lock = self._member_locks[uri] = threading.Lock()
+            return lock
+
+    def close(self):
+        '''
+        Release the underlying archive. Parts that have not been read yet will
+        re-open it on demand.
+        '''
+        with self._lock:
+            if self._zip_file is not None:
+                self._zip_file.close()
+                self._zip_file = None
+            if self._buffer_reader is not None:
+                self._buffer_reader.close()
+                self._buffer_reader = None
+            if self._mapping is not None:
+                try:
+                    self._mapping.close()
+                except BufferError:
+                    # Streams handed out for stored members still reference
+                    # the mapping. It is unmapped once the last of them is
+                    # released.
+                    pass
+                self._mapping = None
 
     def get_part_container(self):
         return self
@@ -215,6 +505,14 @@ class ZipPackage(PackageRelationshipManager):
     def _ensure_parts_are_loaded(self):
         return self.parts
 
+    @property
+    def skipped_member_count(self):
+        '''
+        The number of archive members whose data has not been read.
+        '''
+        self._ensure_parts_are_loaded()
+        return len(self._zip_members) - self.loaded_member_count
+
     def create_part(self, uri):
         self._ensure_parts_are_loaded()
         if self.part_exists(uri):
@@ -223,15 +521,27 @@ class ZipPackage(PackageRelationshipManager):
                     uri=uri,
                 )
             )
+        return self._create_part(uri)
+
+    def _create_part(self, uri):
         part = ZipPackagePart(package=self, uri=uri)
         self.parts[uri] = part
         return part
 
     def part_exists(self, uri):
-        return uri in self.parts
+        return uri in self.parts or uri in self._zip_members
 
     def get_parts(self):
+        self._ensure_parts_are_loaded()
+        for uri in self._zip_members:
+            if uri not in self.parts:
+                self._create_part(uri)
         return self.parts.values()
 
     def get_part(self, uri):
-        return self.parts[uri]
+        part = self.parts.get(uri)
+        if part is None:
+            if uri not in self._zip_members:
+                raise KeyError(uri)
+            part = self._create_part(uri)
+        return part
@@ -144,6 +144,7 @@ class WordprocessingDocumentFactory(object):
         FootnotesPart: 'prepare_footnotes_content',
         MainDocumentPart: 'prepare_main_document_content',
         StyleDefinitionsPart: 'prepare_style_content',
+        NumberingDefinitionsPart: 'prepare_numbering_content',
     }
 
     xml_header = '<?xml version="1.0" encoding="UTF-8"?>'
@@ -291,6 +292,10 @@ class WordprocessingDocumentFactory(object):
         xml = '<styles>{xml}</styles>'.format(xml=xml)
         return self.prepare_xml_content(xml=xml)
 
+    def prepare_numbering_content(self, xml):
+        xml = '<numbering>{xml}</numbering>'.format(xml=xml)
+        return self.prepare_xml_content(xml=xml)
+
     def prepare_footnotes_content(self, xml):
         xml = '<footnotes>{xml}</footnotes>'.format(xml=xml)
         return self.prepare_xml_content(xml=xml)
@@ -333,7 +338,10 @@ class XMLDocx2Html(Docx2Html):
         super(XMLDocx2Html, self).__init__(path=None, *args, **kwargs)
 
     def _load(self):
-        self.document = WordprocessingDocument(path=None)
+        self.document = WordprocessingDocument(
+            path=None,
+            xml_engine=self.xml_engine,
+        )
         package = self.document.package
         document_part = package.create_part(
             uri='/word/document.xml',
@@ -205,13 +205,19 @@ class DocxBuilder(object):
         )
 
     @classmethod
-    def table_cell(self, paragraph, merge=False, merge_continue=False):
+    def table_cell(
+            self,
+            paragraph,
+            merge=False,
+            merge_continue=False,
+            grid_span=None):
         template = env.get_template(templates['tc'])
         return template_render(
             template,
             paragraph=paragraph,
             merge=merge,
             merge_continue=merge_continue,
+            grid_span=grid_span,
         )
 
     @classmethod
@@ -0,0 +1,132 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from unittest import TestCase
+from xml.etree import cElementTree
+
+from pydocx.managers.styles import StylesManager
+from pydocx.models.styles import (
+    ParagraphProperties,
+    RunProperties,
+    Styles,
+)
+
+
+class CountingStylesManager(StylesManager):
+    def __init__(self, *args, **kwargs):
+        super(CountingStylesManager, self).__init__(*args, **kwargs)
+        self.resolved_elements = []
+
+    def _resolve_properties_for_element(self, element):
+        self.resolved_elements.append(element)
+        return super(
+            CountingStylesManager,
+            self,
+        )._resolve_properties_for_element(element)
+
+
+class ResolvedPropertiesTestCase(TestCase):
+    def setUp(self):
+        self.styles_manager = CountingStylesManager()
+        self.styles_manager.styles = Styles.load(cElementTree.fromstring(b'''
+            <styles>
+              <style styleId="foo">
+                <rPr><b val="on" /><i val="on" /><sz val="24" /></rPr>
+              </style>
+            </styles>
+        '''))
+        self.root = cElementTree.fromstring(b'''
+            <body>
+              <p>
+                <hyperlink>
+                  <r id="1" />
+                  <r id="2" />
+                </hyperlink>
+              </p>
+            </body>
+        ''')
+        self.p = self.root.find('p')
+        self.hyperlink = self.p.find('hyperlink')
+        self.runs = self.hyperlink.findall('r')
+        self.stack = [
+            {'element': self.root},
+            {'element': self.p},
+            {'element': self.hyperlink},
+        ]
+
+    def save_properties(self, element, xml, model=RunProperties, frame=None):
+        self.styles_manager.save_properties_for_element(
+            element,
+            model.load(cElementTree.fromstring(xml)),
+            frame=frame,
+        )
+
+    def test_runs_merge_onto_the_properties_of_their_ancestors(self):
+        self.save_properties(
+            self.p,
+            b'<pPr><pStyle val="foo" /></pPr>',
+            model=ParagraphProperties,
+        )
+        self.save_properties(self.runs[0], b'<rPr><i val="off" /></rPr>')
+        properties = self.styles_manager.get_resolved_properties_for_element(
+            self.runs[0],
+            self.stack,
+        )
+        assert bool(properties.bold)
+        assert not bool(properties.italic)
+        properties = self.styles_manager.get_resolved_properties_for_element(
+            self.runs[1],
+            self.stack,
+        )
+        assert bool(properties.bold)
+        assert bool(properties.italic)
+
+    def test_ancestors_are_resolved_once(self):
+        for run in self.runs:
+            self.styles_manager.get_resolved_properties_for_element(
+                run,
+                self.stack,
+            )
+        self.assertEqual(
+            self.styles_manager.resolved_elements,
+            [self.root, self.p, self.hyperlink] + self.runs,
+        )
+
+    def test_saving_properties_drops_what_was_resolved_for_the_frame(self):
+        stack = self.stack[:2]
+        self.styles_manager.get_resolved_properties_for_element(
+            self.hyperlink,
+            stack,
+        )
+        self.save_properties(
+            self.p,
+            b'<pPr><pStyle val="foo" /></pPr>',
+            model=ParagraphProperties,
+            frame=stack[-1],
+        )
+        properties = self.styles_manager.get_resolved_properties_for_element(
+            self.hyperlink,
+            stack,
+        )
+        assert bool(properties.bold)
+
+    def test_inherited_size(self):
+        self.save_properties(
+            self.p,
+            b'<pPr><pStyle val="foo" /></pPr>',
+            model=ParagraphProperties,
+        )
+        self.save_properties(self.runs[0], b'<rPr><sz val="19" /></rPr>')
+        self.save_properties(self.runs[1], b'<rPr><b /></rPr>')
+        self.assertEqual(
+            self.styles_manager.get_inherited_size(self.runs[0], self.stack),
+            24,
+        )
+        # Runs that don't set a size of their own have nothing to compare
+        self.assertEqual(
+            self.styles_manager.get_inherited_size(self.runs[1], self.stack),
+            None,
+        )
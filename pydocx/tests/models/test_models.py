@@ -0,0 +1,79 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from unittest import TestCase
+from xml.etree import cElementTree
+
+from pydocx.models import XmlModel, ChildTag, Attribute
+
+
+class Address(XmlModel):
+    street = Attribute(default='')
+
+
+class Person(XmlModel):
+    first_name = Attribute(name='first', default='')
+    age = Attribute(default='')
+    nickname = ChildTag(attrname='val')
+    height = ChildTag(attrname='val', type=int)
+    address = ChildTag(type=Address)
+    note = ChildTag()
+
+
+class Employee(Person):
+    employer = ChildTag(attrname='val')
+
+
+class XmlModelTestCase(TestCase):
+    def _load_person_from_xml(self, xml, model=Person):
+        return model.load(cElementTree.fromstring(xml))
+
+    def test_fields_are_loaded(self):
+        xml = b'''
+            <person first="Dave" age="25">
+              <nickname val="D" />
+              <height val="180" />
+              <address street="Shadywood" />
+              <note>Hello</note>
+              <unknown val="1" />
+            </person>
+        '''
+        person = self._load_person_from_xml(xml)
+        self.assertEqual(person.first_name, 'Dave')
+        self.assertEqual(person.age, '25')
+        self.assertEqual(person.nickname, 'D')
+        self.assertEqual(person.height, 180)
+        self.assertEqual(person.address.street, 'Shadywood')
+        self.assertEqual(person.note.text, 'Hello')
+
+    def test_defaults_and_items(self):
+        person = self._load_person_from_xml(
+            b'<person><height val="2" /></person>',
+        )
+        self.assertEqual(person.first_name, '')
+        self.assertEqual(person.nickname, None)
+        self.assertEqual(dict(person.items()), {'height': 2})
+        person = Person(first_name='Dave')
+        self.assertEqual(dict(person.items()), {'first_name': 'Dave'})
+
+    def test_fields_are_inherited(self):
+        xml = b'''
+            <person first="Dave">
+              <employer val="Acme" />
+            </person>
+        '''
+        employee = self._load_person_from_xml(xml, model=Employee)
+        self.assertEqual(employee.first_name, 'Dave')
+        self.assertEqual(employee.employer, 'Acme')
+        self.assertEqual(
+            sorted(dict(employee.items()).keys()),
+            ['employer', 'first_name'],
+        )
+
+    def test_instances_are_slotted(self):
+        person = Person(first_name='Dave')
+        assert not hasattr(person, '__dict__')
+        self.assertRaises(AttributeError, setattr, person, 'unknown', 1)
@@ -0,0 +1,113 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from unittest import TestCase
+from xml.etree import cElementTree
+
+from pydocx.models.numbering import Numbering
+
+
+class NumberingTestCase(TestCase):
+    def _load_numbering_from_xml(self, xml):
+        root = cElementTree.fromstring(xml)
+        return Numbering.load(root)
+
+    def test_format_from_abstract_num(self):
+        xml = b'''
+            <numbering>
+              <abstractNum abstractNumId="1">
+                <lvl ilvl="0">
+                  <start val="1" />
+                  <numFmt val="decimal" />
+                </lvl>
+                <lvl ilvl="1">
+                  <numFmt val="lowerLetter" />
+                </lvl>
+              </abstractNum>
+              <num numId="2">
+                <abstractNumId val="1" />
+              </num>
+            </numbering>
+        '''
+        numbering = self._load_numbering_from_xml(xml)
+        self.assertEqual(numbering.get_format('2', '0'), 'decimal')
+        self.assertEqual(numbering.get_format('2', '1'), 'lowerLetter')
+        self.assertEqual(numbering.get_level('2', '0').start, '1')
+
+    def test_missing_num_or_level(self):
+        xml = b'''
+            <numbering>
+              <abstractNum abstractNumId="1">
+                <lvl ilvl="0">
+                  <numFmt val="decimal" />
+                </lvl>
+              </abstractNum>
+              <num numId="1">
+                <abstractNumId val="1" />
+              </num>
+              <num numId="2">
+                <abstractNumId val="3" />
+              </num>
+            </numbering>
+        '''
+        numbering = self._load_numbering_from_xml(xml)
+        self.assertEqual(numbering.get_format('1', '1'), None)
+        self.assertEqual(numbering.get_format('2', '0'), None)
+        self.assertEqual(numbering.get_format('3', '0'), None)
+
+    def test_levels_without_a_format_are_skipped(self):
+        xml = b'''
+            <numbering>
+              <abstractNum abstractNumId="1">
+                <lvl ilvl="0" />
+                <lvl ilvl="0">
+                  <numFmt val="bullet" />
+                </lvl>
+              </abstractNum>
+              <num numId="1">
+                <abstractNumId val="1" />
+              </num>
+            </numbering>
+        '''
+        numbering = self._load_numbering_from_xml(xml)
+        self.assertEqual(numbering.get_format('1', '0'), 'bullet')
+
+    def test_level_override(self):
+        xml = b'''
+            <numbering>
+              <abstractNum abstractNumId="1">
+                <lvl ilvl="0">
+                  <start val="1" />
+                  <numFmt val="decimal" />
+                </lvl>
+                <lvl ilvl="1">
+                  <start val="1" />
+                  <numFmt val="lowerLetter" />
+                </lvl>
+              </abstractNum>
+              <num numId="1">
+                <abstractNumId val="1" />
+              </num>
+              <num numId="2">
+                <abstractNumId val="1" />
+                <lvlOverride ilvl="0">
+                  <lvl ilvl="0">
+                    <start val="1" />
+                    <numFmt val="upperRoman" />
+                  </lvl>
+                </lvlOverride>
+                <lvlOverride ilvl="1">
+                  <startOverride val="5" />
+                </lvlOverride>
+              </num>
+            </numbering>
+        '''
+        numbering = self._load_numbering_from_xml(xml)
+        self.assertEqual(numbering.get_format('1', '0'), 'decimal')
+        self.assertEqual(numbering.get_format('2', '0'), 'upperRoman')
+        self.assertEqual(numbering.get_format('2', '1'), 'lowerLetter')
+        self.assertEqual(numbering.get_level('2', '1').start, '5')
+        self.assertEqual(numbering.get_level('1', '1').start, '1')
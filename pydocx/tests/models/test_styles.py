@@ -170,3 +170,98 @@ class StylesTestCase(TestCase):
         self.assertEqual(character_styles['baz'].name, 'Three')
         self.assertRaises(KeyError, lambda: character_styles['foo'])
         self.assertRaises(KeyError, lambda: character_styles['bar'])
+
+    def test_merged_run_properties_of_style_chain(self):
+        xml = b'''
+            <styles>
+              <style styleId="foo">
+                <basedOn val="bar" />
+                <rPr><b val="on" /></rPr>
+              </style>
+              <style styleId="bar">
+                <basedOn val="baz" />
+                <rPr><b val="off" /><i val="on" /></rPr>
+              </style>
+              <style styleId="baz">
+                <rPr><u val="single" /></rPr>
+              </style>
+            </styles>
+        '''
+        styles = self._load_styles_from_xml(xml)
+        self.assertEqual(
+            [style.style_id for style in styles.get_style_chain(
+                'paragraph',
+                'foo',
+            )],
+            ['foo', 'bar', 'baz'],
+        )
+        properties = dict(styles.get_merged_run_properties('paragraph', 'foo'))
+        self.assertEqual(
+            sorted(properties.keys()),
+            sorted(['bold', 'italic', 'underline']),
+        )
+        assert bool(properties['bold'])
+        assert bool(properties['italic'])
+        self.assertTrue(
+            styles.get_merged_run_properties('paragraph', 'foo') is
+            styles.get_merged_run_properties('paragraph', 'foo'),
+        )
+        self.assertEqual(
+            styles.get_merged_run_properties('paragraph', 'missing'),
+            (),
+        )
+
+    def test_style_chain_stops_at_loops(self):
+        xml = b'''
+            <styles>
+              <style styleId="foo">
+                <basedOn val="bar" />
+                <rPr><b val="on" /></rPr>
+              </style>
+              <style styleId="bar">
+                <basedOn val="foo" />
+                <rPr><b val="off" /></rPr>
+              </style>
+            </styles>
+        '''
+        styles = self._load_styles_from_xml(xml)
+        foo = dict(styles.get_merged_run_properties('paragraph', 'foo'))
+        bar = dict(styles.get_merged_run_properties('paragraph', 'bar'))
+        assert bool(foo['bold'])
+        assert not bool(bar['bold'])
+
+    def test_merged_run_properties_without_headings(self):
+        xml = b'''
+            <styles>
+              <style styleId="foo">
+                <basedOn val="Heading1" />
+                <rPr><i val="on" /></rPr>
+              </style>
+              <style styleId="Heading1">
+                <name val="Heading 1" />
+                <rPr><b val="on" /><u val="single" /></rPr>
+              </style>
+            </styles>
+        '''
+        styles = self._load_styles_from_xml(xml)
+        properties = dict(styles.get_merged_run_properties(
+            'paragraph',
+            'foo',
+            without_headings=True,
+        ))
+        self.assertEqual(list(properties.keys()), ['italic'])
+        self.assertEqual(
+            styles.get_merged_run_properties(
+                'paragraph',
+                'Heading1',
+                without_headings=True,
+            ),
+            (),
+        )
+        # The heading styles themselves are left as they were loaded
+        properties = dict(styles.get_merged_run_properties('paragraph', 'foo'))
+        self.assertEqual(
+            sorted(properties.keys()),
+            sorted(['bold', 'italic', 'underline']),
+        )
+        assert bool(styles.styles[1].run_properties.bold)
@@ -0,0 +1,100 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from unittest import TestCase
+from xml.etree import cElementTree
+
+from pydocx.models.table import TableGrid
+
+
+class TableGridTestCase(TestCase):
+    def _load_grid_from_xml(self, xml):
+        table = cElementTree.fromstring(xml)
+        cells = dict(
+            (tc.get('id'), tc)
+            for tc in table.iter('tc')
+        )
+        return TableGrid.load(table), cells
+
+    def test_grid_columns_account_for_spans_and_grid_before(self):
+        xml = b'''
+            <tbl>
+              <tr>
+                <tc id="a"><tcPr><gridSpan val="2" /></tcPr></tc>
+                <tc id="b" />
+              </tr>
+              <tr>
+                <trPr><gridBefore val="1" /></trPr>
+                <tc id="c" />
+                <tc id="d" />
+              </tr>
+            </tbl>
+        '''
+        grid, cells = self._load_grid_from_xml(xml)
+        self.assertEqual(grid.grid_column(cells['a']), 0)
+        self.assertEqual(grid.grid_column(cells['b']), 2)
+        self.assertEqual(grid.grid_column(cells['c']), 1)
+        self.assertEqual(grid.grid_column(cells['d']), 2)
+
+    def test_rowspan_counts_the_rows_continuing_the_merge(self):
+        xml = b'''
+            <tbl>
+              <tr>
+                <tc id="a"><tcPr><vMerge val="restart" /></tcPr></tc>
+                <tc id="b"><tcPr><vMerge val="restart" /></tcPr></tc>
+              </tr>
+              <tr>
+                <tc id="c"><tcPr><vMerge /></tcPr></tc>
+                <tc id="d"><tcPr><vMerge val="continue" /></tcPr></tc>
+              </tr>
+              <tr>
+                <tc id="e" />
+                <tc id="f"><tcPr><vMerge /></tcPr></tc>
+              </tr>
+              <tr>
+                <tc id="g"><tcPr><vMerge /></tcPr></tc>
+                <tc id="h" />
+              </tr>
+            </tbl>
+        '''
+        grid, cells = self._load_grid_from_xml(xml)
+        self.assertEqual(grid.rowspan(cells['a']), 2)
+        self.assertEqual(grid.rowspan(cells['b']), 3)
+        self.assertEqual(grid.rowspan(cells['e']), 1)
+        # A merge that was ended by a row in between isn't continued
+        self.assertEqual(grid.rowspan(cells['g']), 1)
+
+    def test_merges_follow_the_grid_column(self):
+        xml = b'''
+            <tbl>
+              <tr>
+                <tc id="a"><tcPr><gridSpan val="2" /></tcPr></tc>
+                <tc id="b"><tcPr><vMerge val="restart" /></tcPr></tc>
+              </tr>
+              <tr>
+                <tc id="c" />
+                <tc id="d" />
+                <tc id="e"><tcPr><vMerge /></tcPr></tc>
+              </tr>
+            </tbl>
+        '''
+        grid, cells = self._load_grid_from_xml(xml)
+        self.assertEqual(grid.rowspan(cells['b']), 2)
+
+    def test_cells_of_nested_tables_are_not_included(self):
+        xml = b'''
+            <tbl>
+              <tr>
+                <tc id="a">
+                  <tbl><tr><tc id="b" /></tr></tbl>
+                </tc>
+              </tr>
+            </tbl>
+        '''
+        grid, cells = self._load_grid_from_xml(xml)
+        self.assertEqual(grid.rowspan(cells['a']), 1)
+        self.assertEqual(grid.rowspan(cells['b']), None)
+        self.assertEqual(grid.grid_column(cells['b']), None)
@@ -5,20 +5,38 @@ from __future__ import (
 )
 
 import base64
+import gc
 import os
 from tempfile import NamedTemporaryFile
 from unittest import TestCase
 
+from nose import SkipTest
 from nose.tools import raises
 
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
 from pydocx.tests import (
     assert_html_equal,
     html_is_equal,
     prettify,
     BASE_HTML,
+    BASE_HTML_NO_STYLE,
+    Docx2HtmlNoStyle,
+    WordprocessingDocumentFactory,
 )
+from pydocx.openxml import OpenXmlPart, SharedPartCache
 from pydocx.parsers.Docx2Html import Docx2Html
-from pydocx.util.zip import ZipFile
+from pydocx.util.buffer import HAS_MEMORYVIEW
+from pydocx.util.xml import get_xml_engine
+from pydocx.util.zip import ZipFile, create_zip_archive
+from pydocx.wordml import (
+    MainDocumentPart,
+    NumberingDefinitionsPart,
+    StyleDefinitionsPart,
+)
 from pydocx.exceptions import MalformedDocxException
 
 
@@ -124,10 +142,305 @@ class ConvertDocxToHtmlTestCase(TestCase):
         assert file_html
         self.assertEqual(path_html, file_html)
 
+    def test_result_from_in_memory_buffers_matches_result_from_path(self):
+        path = self.get_path_to_fixture('has_image.docx')
+        path_html = self.convert_docx_to_html(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        buffers = [data, bytearray(data)]
+        if HAS_MEMORYVIEW:
+            buffers.append(memoryview(data))
+        for buf in buffers:
+            self.assertEqual(path_html, self.convert_docx_to_html(buf))
+
+    def test_result_with_prefetched_parts_matches_result_without(self):
+        for fixture in ('has_image.docx', 'external_image.docx'):
+            path = self.get_path_to_fixture(fixture)
+            self.assertEqual(
+                self.convert_docx_to_html(path),
+                self.convert_docx_to_html(path, prefetch_workers=4),
+            )
+
+    def test_result_with_shared_part_cache_matches_result_without(self):
+        path = self.get_path_to_fixture('lists_with_styles.docx')
+        expected = self.convert_docx_to_html(path)
+        OpenXmlPart.shared_part_cache = SharedPartCache()
+        try:
+            self.assertEqual(expected, self.convert_docx_to_html(path))
+            self.assertEqual(expected, self.convert_docx_to_html(path))
+        finally:
+            OpenXmlPart.shared_part_cache = None
+
+    def test_result_from_non_seekable_stream_matches_result_from_path(self):
+        class Stream(object):
+            def __init__(self, f):
+                self.f = f
+
+            def read(self, size=-1):
+                return self.f.read(size)
+
+        path = self.get_path_to_fixture('simple.docx')
+        path_html = self.convert_docx_to_html(path)
+        with open(path, 'rb') as f:
+            stream_html = self.convert_docx_to_html(Stream(f))
+        self.assertEqual(path_html, stream_html)
+
 
 ConvertDocxToHtmlTestCase.generate()
 
 
+class ElementTreeConvertDocxToHtmlTestCase(ConvertDocxToHtmlTestCase):
+    xml_engine = 'etree'
+
+    def convert_docx_to_html(self, path_to_docx, *args, **kwargs):
+        kwargs['xml_engine'] = self.xml_engine
+        return Docx2Html(path_to_docx, *args, **kwargs).parsed
+
+
+class LxmlConvertDocxToHtmlTestCase(ElementTreeConvertDocxToHtmlTestCase):
+    xml_engine = 'lxml'
+
+    def setUp(self):
+        try:
+            get_xml_engine(self.xml_engine)
+        except ImportError:
+            raise SkipTest('lxml is not installed')
+
+
+class SharedStylesTestCase(TestCase):
+    styles_xml = '''
+        <style styleId="Heading1" type="paragraph">
+            <name val="Heading 1"/>
+            <rPr><b val="on"/></rPr>
+        </style>
+    '''
+
+    document_xml = '''
+        <p>
+            <pPr><pStyle val="Heading1"/></pPr>
+            <r><t>AAA</t></r>
+        </p>
+    '''
+
+    def setUp(self):
+        OpenXmlPart.shared_part_cache = SharedPartCache()
+
+    def tearDown(self):
+        OpenXmlPart.shared_part_cache = None
+
+    def test_conversions_do_not_change_the_shared_styles(self):
+        document = WordprocessingDocumentFactory()
+        document.add(StyleDefinitionsPart, self.styles_xml)
+        document.add(MainDocumentPart, self.document_xml)
+        archive = bytearray(
+            create_zip_archive(document.to_zip_dict()).getvalue()
+        )
+
+        first = Docx2HtmlNoStyle(archive)
+        html = first.parsed
+        assert_html_equal(html, BASE_HTML_NO_STYLE % '<h1>AAA</h1>')
+        # The heading's run properties are only left out of the conversion
+        style = first.styles.get_styles_by_type('paragraph')['Heading1']
+        assert bool(style.run_properties.bold)
+
+        second = Docx2HtmlNoStyle(archive)
+        self.assertEqual(second.parsed, html)
+        self.assertTrue(second.styles is first.styles)
+
+
+class StreamingDocx2Html(Docx2Html):
+    # Make every top-level element that isn't part of a list its own chunk
+    streaming_chunk_size = 1
+
+
+class StreamingDocx2HtmlNoStyle(Docx2HtmlNoStyle):
+    streaming_chunk_size = 1
+
+
+class StreamingConvertDocxToHtmlTestCase(ConvertDocxToHtmlTestCase):
+    def convert_docx_to_html(self, path_to_docx, *args, **kwargs):
+        return StreamingDocx2Html(
+            path_to_docx,
+            streaming=True,
+            *args,
+            **kwargs
+        ).parsed
+
+
+class StreamingListsTestCase(TestCase):
+    numbering_xml = '''
+        <abstractNum abstractNumId="1">
+            <lvl ilvl="0"><numFmt val="decimal"/></lvl>
+        </abstractNum>
+        <num numId="1"><abstractNumId val="1"/></num>
+    '''
+
+    styles_xml = '''
+        <style styleId="Heading1" type="paragraph">
+            <name val="Heading 1"/>
+        </style>
+    '''
+
+    def assert_streaming_matches(self, document_xml, expected_html):
+        document = WordprocessingDocumentFactory()
+        document.add(NumberingDefinitionsPart, self.numbering_xml)
+        document.add(StyleDefinitionsPart, self.styles_xml)
+        document.add(MainDocumentPart, document_xml)
+        archive = bytearray(
+            create_zip_archive(document.to_zip_dict()).getvalue()
+        )
+        html = Docx2HtmlNoStyle(archive).parsed
+        streamed_html = StreamingDocx2HtmlNoStyle(
+            archive,
+            streaming=True,
+        ).parsed
+        assert_html_equal(html, BASE_HTML_NO_STYLE % expected_html)
+        self.assertEqual(streamed_html, html)
+
+    def test_heading_list_item_does_not_end_the_list(self):
+        # The heading is no longer the last item of the list, so the list
+        # goes on to take in the paragraph after it
+        self.assert_streaming_matches(
+            '''
+            <p>
+                <pPr><numPr><ilvl val="0"/><numId val="1"/></numPr></pPr>
+                <r><t>a</t></r>
+            </p>
+            <p>
+                <pPr>
+                    <pStyle val="Heading1"/>
+                    <numPr><ilvl val="0"/><numId val="1"/></numPr>
+                </pPr>
+                <r><t>b</t></r>
+            </p>
+            <p><r><t>c</t></r></p>
+            ''',
+            '<ol list-style-type="decimal">'
+            '<li>a<br /><h1>b</h1><br />c</li>'
+            '</ol>',
+        )
+
+    def test_empty_paragraphs_within_a_list_do_not_end_it(self):
+        self.assert_streaming_matches(
+            '''
+            <p>
+                <pPr><numPr><ilvl val="0"/><numId val="1"/></numPr></pPr>
+                <r><t>a</t></r>
+            </p>
+            <p><r><t>b</t></r></p>
+            <p></p>
+            <p><r><t>c</t></r></p>
+            <p>
+                <pPr><numPr><ilvl val="0"/><numId val="1"/></numPr></pPr>
+                <r><t>d</t></r>
+            </p>
+            <p><r><t>e</t></r></p>
+            ''',
+            '<ol list-style-type="decimal"><li>a<br />b<br />c</li>'
+            '<li>d</li></ol><p>e</p>',
+        )
+
+
+class StreamingMemoryTestCase(TestCase):
+    paragraph_count = 1000
+
+    def setUp(self):
+        document = WordprocessingDocumentFactory()
+        document.add(MainDocumentPart, ''.join(
+            '''
+            <p>
+                <pPr><jc val="center"/></pPr>
+                <r><rPr><b/></rPr><t>Paragraph {i}</t></r>
+                <r><t> of the document</t></r>
+            </p>
+            '''.format(i=i)
+            for i in range(self.paragraph_count)
+        ))
+        self.archive = bytearray(
+            create_zip_archive(document.to_zip_dict()).getvalue()
+        )
+
+    def create_lists_archive(self, list_count, num_count):
+        '''
+        Return a document of `list_count` lists of four items, each followed
+        by a paragraph, with `num_count` lists defined in its numbering. Each
+        paragraph carries a long bookmark, so that the document is large
+        compared to what it converts to.
+        '''
+        document = WordprocessingDocumentFactory()
+        document.add(NumberingDefinitionsPart, '''
+            <abstractNum abstractNumId="1">
+                <lvl ilvl="0"><numFmt val="decimal"/></lvl>
+                <lvl ilvl="1"><numFmt val="bullet"/></lvl>
+            </abstractNum>
+        ''' + ''.join(
+            '<num numId="{i}"><abstractNumId val="1"/></num>'.format(i=i)
+            for i in range(num_count)
+        ))
+        bookmark = '<bookmarkStart id="0" name="{name}"/>'.format(
+            name='x' * 1000,
+        )
+        paragraphs = []
+        for i in range(list_count):
+            for ilvl in (0, 1, 1, 0):
+                paragraphs.append('''
+                    <p>
+                        <pPr><numPr>
+                            <ilvl val="{ilvl}"/><numId val="{i}"/>
+                        </numPr></pPr>
+                        <r><t>Item</t></r>
+                        {bookmark}
+                    </p>
+                '''.format(i=i, ilvl=ilvl, bookmark=bookmark))
+            paragraphs.append(
+                '<p><r><t>Paragraph</t></r>{bookmark}</p>'.format(
+                    bookmark=bookmark,
+                )
+            )
+        document.add(MainDocumentPart, ''.join(paragraphs))
+        return bytearray(create_zip_archive(document.to_zip_dict()).getvalue())
+
+    def convert(self, archive=None, **kwargs):
+        if archive is None:
+            archive = self.archive
+        gc.collect()
+        tracemalloc.start()
+        try:
+            html = Docx2HtmlNoStyle(archive, **kwargs).parsed
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return html, peak
+
+    def test_streaming_peak_memory_does_not_grow_with_the_document(self):
+        if tracemalloc is None:
+            raise SkipTest('tracemalloc is not available')
+        html, peak = self.convert()
+        streamed_html, streamed_peak = self.convert(streaming=True)
+        self.assertEqual(html, streamed_html)
+        # The tree for the whole body is about 8x the size of the chunks
+        self.assertTrue(streamed_peak * 3 < peak, (streamed_peak, peak))
+
+    def test_streaming_peak_memory_with_lists_stays_flat(self):
+        if tracemalloc is None:
+            raise SkipTest('tracemalloc is not available')
+        list_count = 50
+        # Both documents define the same lists, so that only the body grows
+        small_archive = self.create_lists_archive(list_count, list_count * 4)
+        large_archive = self.create_lists_archive(
+            list_count * 4,
+            list_count * 4,
+        )
+        _, small_peak = self.convert(small_archive, streaming=True)
+        _, large_peak = self.convert(large_archive, streaming=True)
+        # Without streaming the peak is about 3.5x larger for the larger
+        # document, with it only the list boundaries and the HTML grow
+        self.assertTrue(
+            large_peak < small_peak * 1.25,
+            (small_peak, large_peak),
+        )
+
+
 def get_image_data(docx_file_path, image_name):
     """
     Return base 64 encoded data for the image_name that is stored in the
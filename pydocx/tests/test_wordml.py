@@ -1,15 +1,50 @@
 from __future__ import (
     absolute_import,
+    division,
     print_function,
     unicode_literals,
 )
 
+import gc
+import struct
+import threading
 import unittest
+import zipfile
+from tempfile import NamedTemporaryFile
 
-from pydocx.packaging import ZipPackage
+from nose import SkipTest
+
+try:
+    from cString import StringIO
+    BytesIO = StringIO
+except ImportError:
+    from io import BytesIO
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from pydocx.exceptions import MalformedDocxException
+from pydocx.openxml import OpenXmlPart, SharedPartCache
+from pydocx.packaging import PackageRelationship, ZipPackage
+from pydocx.util.buffer import (
+    HAS_MEMORYVIEW,
+    MMAP_SUPPORTS_MEMORYVIEW,
+    MemoryViewReader,
+)
 from pydocx.util.xml import xml_tag_split
+from pydocx.util.zip import ZipFile, create_zip_archive
 from pydocx.wordml import MainDocumentPart, WordprocessingDocument
 
+HYPERLINK_RELATIONSHIP_TYPE = '/'.join([
+    'http://schemas.openxmlformats.org',
+    'officeDocument',
+    '2006',
+    'relationships',
+    'hyperlink',
+])
+
 
 class ZipPackageTestCase(unittest.TestCase):
     def setUp(self):
@@ -35,6 +70,274 @@ class ZipPackageTestCase(unittest.TestCase):
         assert data
         assert data.startswith(b'<?xml version="1.0" encoding="UTF-8"?>')
 
+    def test_part_streams_are_decompressed_on_demand(self):
+        assert self.package.part_exists('/word/document.xml')
+        self.assertEqual(self.package.streams, {})
+
+        part = self.package.get_part('/word/document.xml')
+        assert part.stream.read()
+        self.assertEqual(list(self.package.streams), ['/word/document.xml'])
+
+    def test_parts_are_only_wrapped_when_referenced(self):
+        path = 'pydocx/fixtures/has_image.docx'
+        with ZipFile(path) as f:
+            member_count = len(f.namelist())
+        document = WordprocessingDocument(path=path)
+        package = document.package
+        main_document_part = document.main_document_part
+        assert main_document_part.root_element is not None
+        image_part, = main_document_part.image_parts
+        assert image_part.stream.read()
+        # Members reached through relationships are loaded
+        for uri in [
+            '/_rels/.rels',
+            '/word/_rels/document.xml.rels',
+            '/word/document.xml',
+            image_part.uri,
+        ]:
+            assert uri in package.parts
+            assert uri in package.streams
+        # Nothing refers to the content types, so they are never read
+        assert package.part_exists('/[Content_Types].xml')
+        assert '/[Content_Types].xml' not in package.parts
+        assert '/[Content_Types].xml' not in package.streams
+        self.assertEqual(package.loaded_member_count, len(package.streams))
+        self.assertEqual(
+            package.skipped_member_count,
+            member_count - len(package.streams),
+        )
+
+    def test_concurrent_reads_inflate_a_member_once(self):
+        data = b' ' * (1024 * 1024)
+        archive = BytesIO()
+        f = zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED)
+        f.writestr('word/document.xml', data)
+        f.close()
+        package = ZipPackage(path=bytearray(archive.getvalue()))
+        uri = '/word/document.xml'
+        package.get_part(uri)
+        streams = []
+        threads = [
+            threading.Thread(
+                target=lambda: streams.append(package.get_stream(uri)),
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(streams), 8)
+        self.assertTrue(all(stream is streams[0] for stream in streams))
+        self.assertEqual(package.loaded_member_count, 1)
+        self.assertEqual(package.inflated_size, len(data))
+        self.assertEqual(package.skipped_member_count, 0)
+
+    def test_get_parts_wraps_every_member(self):
+        uris = set(part.uri for part in self.package.get_parts())
+        assert '/docProps/app.xml' in uris
+        self.assertEqual(self.package.loaded_member_count, 0)
+
+    def test_part_stream_is_available_after_close(self):
+        part = self.package.get_part('/word/document.xml')
+        self.package.close()
+        assert part.stream.read()
+
+
+class RelationshipMemoryTestCase(unittest.TestCase):
+    # A dict-backed PackageRelationship, with a dictionary per part and an
+    # uninterned copy of the type and target mode for every entry, took about
+    # 460 bytes per hyperlink on CPython 3.11.
+    max_bytes_per_relationship = 300
+    relationship_count = 5000
+
+    def setUp(self):
+        relationships = ''.join(
+            '''<Relationship Id="rId{i}" Type="{type}"
+                Target="http://example.com/{i}" TargetMode="External"/>
+            '''.format(i=i, type=HYPERLINK_RELATIONSHIP_TYPE)
+            for i in range(self.relationship_count)
+        )
+        archive = create_zip_archive({
+            'word/document.xml': '<document/>',
+            'word/_rels/document.xml.rels': (
+                '<Relationships xmlns="{namespace}">{relationships}'
+                '</Relationships>'
+            ).format(
+                namespace=PackageRelationship.namespace,
+                relationships=relationships,
+            ),
+        })
+        self.package = ZipPackage(path=bytearray(archive.getvalue()))
+        self.part = self.package.get_part('/word/document.xml')
+
+    def test_relationships_are_slotted(self):
+        relationship = self.part.get_relationship('rId0')
+        assert not hasattr(relationship, '__dict__')
+        assert not hasattr(self.part, '__dict__')
+
+    def test_relationship_values_are_shared(self):
+        first = self.part.get_relationship('rId0')
+        last = self.part.get_relationship('rId4999')
+        self.assertTrue(first.relationship_type is last.relationship_type)
+        self.assertTrue(first.target_mode is last.target_mode)
+        self.assertEqual(
+            len(self.part.get_relationships_by_type(
+                HYPERLINK_RELATIONSHIP_TYPE,
+            )),
+            self.relationship_count,
+        )
+
+    def test_memory_per_relationship(self):
+        if tracemalloc is None:
+            raise SkipTest('tracemalloc is not available')
+        # Read the .rels data up front so only the relationships are measured
+        self.package.get_part(self.part.relationship_uri).stream
+        gc.collect()
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            self.part.get_relationship('rId0')
+            gc.collect()
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        bytes_per_relationship = (after - before) / self.relationship_count
+        self.assertTrue(
+            bytes_per_relationship < self.max_bytes_per_relationship,
+            bytes_per_relationship,
+        )
+
+
+class MemoryMappedZipPackageTestCase(unittest.TestCase):
+    def test_deflated_members_match_buffered_package(self):
+        path = 'pydocx/fixtures/has_image.docx'
+        package = ZipPackage(path=path)
+        mapped_package = ZipPackage(path=path, use_mmap=True)
+        for uri in ['/word/document.xml', '/word/media/image1.gif']:
+            self.assertEqual(
+                mapped_package.get_part(uri).stream.read(),
+                package.get_part(uri).stream.read(),
+            )
+        mapped_package.close()
+
+    def test_stored_members_are_exposed_without_copying(self):
+        if not MMAP_SUPPORTS_MEMORYVIEW:
+            raise SkipTest('memory maps are not used on python 2')
+        archive = create_zip_archive({'word/media/image1.png': 'image data'})
+        with NamedTemporaryFile(suffix='.docx') as f:
+            f.write(archive.getvalue())
+            f.flush()
+            package = ZipPackage(path=f.name, use_mmap=True)
+            stream = package.get_part('/word/media/image1.png').stream
+            assert isinstance(stream, MemoryViewReader)
+            assert isinstance(stream.getbuffer(), memoryview)
+            package.close()
+            self.assertEqual(stream.read(), b'image data')
+
+
+class InMemoryZipPackageTestCase(unittest.TestCase):
+    def test_stored_members_are_slices_of_the_input(self):
+        if not HAS_MEMORYVIEW:
+            raise SkipTest('memoryview is not available')
+        archive = create_zip_archive({'word/document.xml': '<document/>'})
+        data = bytearray(archive.getvalue())
+        package = ZipPackage(path=data)
+        stream = package.get_part('/word/document.xml').stream
+        assert isinstance(stream, MemoryViewReader)
+        self.assertEqual(stream.read(), b'<document/>')
+
+        # The part is a view of the caller's buffer, not a copy
+        offset = bytes(data).index(b'<document/>')
+        data[offset + 1:offset + 9] = b'DOCUMENT'
+        self.assertEqual(stream.getbuffer().tobytes(), b'<DOCUMENT/>')
+
+    def test_bytearrays_are_read(self):
+        archive = create_zip_archive({'word/document.xml': '<document/>'})
+        package = ZipPackage(path=bytearray(archive.getvalue()))
+        stream = package.get_part('/word/document.xml').stream
+        self.assertEqual(stream.read(), b'<document/>')
+
+
+class ZipPackageSizeLimitsTestCase(unittest.TestCase):
+    uri = '/word/document.xml'
+    size = 10 * 1024 * 1024
+
+    def setUp(self):
+        archive = BytesIO()
+        f = zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED)
+        f.writestr('word/styles.xml', b'<styles/>')
+        f.writestr('word/document.xml', b' ' * self.size)
+        f.close()
+        self.archive = bytearray(archive.getvalue())
+
+    def understate_size(self, filename, size):
+        '''
+        Return a copy of the archive whose headers declare that the member
+        `filename` is only `size` bytes once it is inflated.
+        '''
+        archive = bytearray(self.archive)
+        f = zipfile.ZipFile(BytesIO(bytes(archive)))
+        member = f.getinfo(filename)
+        f.close()
+        # The uncompressed size of the local file header
+        struct.pack_into(str('<I'), archive, member.header_offset + 22, size)
+        # And the one of its entry in the central directory
+        name = filename.encode('utf-8')
+        offset = archive.index(b'PK\x01\x02')
+        while archive[offset + 46:offset + 46 + len(name)] != name:
+            offset = archive.index(b'PK\x01\x02', offset + 4)
+        struct.pack_into(str('<I'), archive, offset + 24, size)
+        return archive
+
+    def read(self, source, uri=None, **limits):
+        package = ZipPackage(path=source, **limits)
+        return package, package.get_part(uri or self.uri).stream.read()
+
+    def test_no_limits_by_default(self):
+        _, data = self.read(self.archive)
+        self.assertEqual(len(data), self.size)
+
+    def test_max_member_size_stops_inflating_early(self):
+        # The declared size is within the limit, so the data has to be
+        # inflated before the limit can be detected
+        archive = self.understate_size('word/document.xml', 10)
+        package = ZipPackage(path=archive, max_member_size=1024 * 1024)
+        self.assertRaises(
+            MalformedDocxException,
+            lambda: package.get_part(self.uri).stream,
+        )
+        assert package.inflated_size <= 1024 * 1024
+
+    def test_max_member_size_for_a_file_object(self):
+        self.assertRaises(
+            MalformedDocxException,
+            lambda: self.read(BytesIO(self.archive), max_member_size=1024),
+        )
+
+    def test_max_total_size(self):
+        package, _ = self.read(
+            self.archive,
+            uri='/word/styles.xml',
+            max_total_size=self.size,
+        )
+        self.assertRaises(
+            MalformedDocxException,
+            lambda: package.get_part(self.uri).stream,
+        )
+
+    def test_max_compression_ratio(self):
+        self.assertRaises(
+            MalformedDocxException,
+            lambda: self.read(self.archive, max_compression_ratio=100),
+        )
+        _, data = self.read(
+            self.archive,
+            uri='/word/styles.xml',
+            max_compression_ratio=100,
+        )
+        self.assertEqual(data, b'<styles/>')
+
 
 class WordprocessingDocumentTestCase(unittest.TestCase):
     def setUp(self):
@@ -97,6 +400,23 @@ class WordprocessingDocumentTestCase(unittest.TestCase):
         part = self.document.main_document_part.numbering_definitions_part
         self.assertEqual(part, None)
 
+    def test_prefetch_parts(self):
+        document = WordprocessingDocument(
+            path='pydocx/fixtures/has_image.docx',
+        )
+        main_document_part = document.main_document_part
+        main_document_part.prefetch_parts(max_workers=4)
+        package = document.package
+        for uri in [
+                '/word/document.xml',
+                '/word/fontTable.xml',
+                '/word/media/image1.gif',
+                '/word/styles.xml']:
+            assert uri in package.streams
+        styles = main_document_part.style_definitions_part
+        assert main_document_part._root_element is not None
+        assert styles._root_element is not None
+
     def test_image_parts(self):
         image_document = WordprocessingDocument(
             path='pydocx/fixtures/has_image.docx',
@@ -104,3 +424,50 @@ class WordprocessingDocumentTestCase(unittest.TestCase):
         parts = image_document.main_document_part.image_parts
         self.assertEqual(len(parts), 1)
         self.assertEqual(parts[0].uri, '/word/media/image1.gif')
+
+
+class SharedPartCacheTestCase(unittest.TestCase):
+    path = 'pydocx/fixtures/nested_lists.docx'
+
+    def setUp(self):
+        self.cache = SharedPartCache(max_entries=4)
+        OpenXmlPart.shared_part_cache = self.cache
+
+    def tearDown(self):
+        OpenXmlPart.shared_part_cache = None
+
+    def load_main_document_part(self):
+        return WordprocessingDocument(path=self.path).main_document_part
+
+    def test_parsed_parts_are_shared_between_documents(self):
+        first = self.load_main_document_part()
+        second = self.load_main_document_part()
+        self.assertTrue(
+            first.style_definitions_part.styles is
+            second.style_definitions_part.styles
+        )
+        self.assertTrue(
+            first.numbering_definitions_part.root_element is
+            second.numbering_definitions_part.root_element
+        )
+        self.assertTrue(
+            first.numbering_definitions_part.numbering is
+            second.numbering_definitions_part.numbering
+        )
+        self.assertFalse(first.root_element is second.root_element)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 2)
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['entries'], 2)
+
+    def test_hits_are_verified_against_the_data(self):
+        class Member(object):
+            CRC = 1
+            file_size = 8
+
+        first = self.cache.get(Member, b'<a></a>', lambda data: data)
+        second = self.cache.get(Member, b'<b></b>', lambda data: data)
+        self.assertEqual(first.root_element, b'<a></a>')
+        self.assertEqual(second.root_element, b'<b></b>')
+        self.assertEqual(self.cache.stats()['hits'], 0)
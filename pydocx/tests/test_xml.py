@@ -194,6 +194,38 @@ class RowSpanTestCase(_TranslationTestCase):
         return xml
 
 
+class RowSpanInSpannedColumnTestCase(_TranslationTestCase):
+
+    expected_output = '''
+           <table border="1">
+            <tr>
+                <td colspan="2">AAA</td>
+                <td rowspan="2">BBB</td>
+            </tr>
+            <tr>
+                <td>CCC</td>
+                <td>DDD</td>
+            </tr>
+        </table>
+    '''
+
+    def get_xml(self):
+        cell1 = DXB.table_cell(paragraph=DXB.p_tag('AAA'), grid_span=2)
+        cell2 = DXB.table_cell(paragraph=DXB.p_tag('BBB'), merge=True)
+        cell3 = DXB.table_cell(paragraph=DXB.p_tag('CCC'))
+        cell4 = DXB.table_cell(paragraph=DXB.p_tag('DDD'))
+        cell5 = DXB.table_cell(
+            paragraph=DXB.p_tag(None), merge_continue=True)
+        rows = [
+            DXB.table_row([cell1, cell2]),
+            DXB.table_row([cell3, cell4, cell5]),
+        ]
+        table = DXB.table(rows)
+        body = table
+        xml = DXB.xml(body)
+        return xml
+
+
 class NestedTableTag(_TranslationTestCase):
     expected_output = '''
         <table border="1">
@@ -561,6 +593,87 @@ class DeeplyNestedTableTestCase(_TranslationTestCase):
             assert total_time < expected_time, error_message
 
 
+class NestedTablesTestCase(_TranslationTestCase):
+    expected_output = ''
+    run_expected_output = False
+
+    def get_xml(self):
+        # Each table is in a cell of the next, along with a few paragraphs
+        table = ''
+        for _ in range(60):
+            paragraphs = ''.join(
+                DXB.p_tag('%d' % i).decode('utf-8')
+                for i in range(20)
+            )
+            cell = DXB.table_cell(paragraphs + table).decode('utf-8')
+            row = DXB.table_row([cell]).decode('utf-8')
+            table = DXB.table([row]).decode('utf-8')
+        body = table.encode('utf-8')
+        xml = DXB.xml(body)
+        return xml
+
+    def test_performance(self):
+        with self.toggle_run_expected_output():
+            start_time = time.time()
+            try:
+                self.test_expected_output()
+            except AssertionError:
+                pass
+            end_time = time.time()
+            total_time = end_time - start_time
+            # This finishes in about a second on python 2.7
+            expected_time = 3
+            if sys.version_info[0] == 3:
+                expected_time = 5  # Slower on python 3
+            error_message = 'Total time: %s; Expected time: %d' % (
+                total_time,
+                expected_time,
+            )
+            assert total_time < expected_time, error_message
+
+
+class DeeplyNestedTablesTestCase(_TranslationTestCase):
+    # Deep enough that walking the tree recursively would go over the
+    # recursion limit
+    depth = 400
+
+    @property
+    def expected_output(self):
+        html = ''
+        for i in range(self.depth):
+            html = '<table border="1"><tr><td>%d%s</td></tr></table>' % (
+                i,
+                html,
+            )
+        return html
+
+    def get_xml(self):
+        table = ''
+        for i in range(self.depth):
+            paragraph = DXB.p_tag('%d' % i).decode('utf-8')
+            cell = DXB.table_cell(paragraph + table).decode('utf-8')
+            row = DXB.table_row([cell]).decode('utf-8')
+            table = DXB.table([row]).decode('utf-8')
+        body = table.encode('utf-8')
+        xml = DXB.xml(body)
+        return xml
+
+    def test_performance(self):
+        start_time = time.time()
+        self.test_expected_output()
+        end_time = time.time()
+        total_time = end_time - start_time
+        # This finishes in under a second on python 2.7
+        expected_time = 3
+        if sys.version_info[0] == 3:
+            expected_time = 5  # Slower on python 3
+        error_message = 'Total time: %s; Expected time: %d' % (
+            total_time,
+            expected_time,
+        )
+        assert total_time < expected_time, error_message
+
+
 class LargeCellTestCase(_TranslationTestCase):
     expected_output = ''
     run_expected_output = False
@@ -595,6 +708,73 @@ class LargeCellTestCase(_TranslationTestCase):
             assert total_time < expected_time, error_message
 
 
+class ManyListsTestCase(_TranslationTestCase):
+    expected_output = ''
+    run_expected_output = False
+    convert_root_level_upper_roman = True
+    list_count = 400
+
+    def get_xml(self, list_count=None):
+        if list_count is None:
+            list_count = self.list_count
+        # Many short lists, each with their own numId and a few levels
+        body = b''
+        for num_id in range(list_count):
+            for ilvl in (0, 1, 2, 1, 0):
+                body += DXB.li(text='AAA', ilvl=ilvl, numId=num_id)
+            body += DXB.p_tag('BBB')
+        xml = DXB.xml(body)
+        return xml
+
+    def time_conversion(self, list_count):
+        tree = self.get_xml(list_count)
+        start_time = time.time()
+        self.parser(
+            convert_root_level_upper_roman=self.convert_root_level_upper_roman,
+            document_xml=tree,
+            relationships=self.relationships,
+            numbering_dict=self.numbering_dict,
+            styles_xml=self.styles_xml,
+        ).parsed
+        return time.time() - start_time
+
+    def test_time_grows_linearly_with_the_number_of_lists(self):
+        list_count = self.list_count // 4
+        # Take the fastest of a few runs of each, to keep out noise
+        small_time = min(self.time_conversion(list_count) for _ in range(3))
+        large_time = min(
+            self.time_conversion(list_count * 4)
+            for _ in range(3)
+        )
+        # Four times the lists takes about four times as long. Comparing
+        # every list against every other one would take sixteen times.
+        ratio = large_time / small_time
+        assert ratio < 8, 'Time ratio: %s (%s, %s)' % (
+            ratio,
+            small_time,
+            large_time,
+        )
+
+    def test_performance(self):
+        with self.toggle_run_expected_output():
+            start_time = time.time()
+            try:
+                self.test_expected_output()
+            except AssertionError:
+                pass
+            end_time = time.time()
+            total_time = end_time - start_time
+            # This finishes in under a second on python 2.7
+            expected_time = 3
+            if sys.version_info[0] == 3:
+                expected_time = 5  # Slower on python 3
+            error_message = 'Total time: %s; Expected time: %d' % (
+                total_time,
+                expected_time,
+            )
+            assert total_time < expected_time, error_message
+
+
 class NonStandardTextTagsTestCase(_TranslationTestCase):
     expected_output = '''
         <p><span class="pydocx-insert">insert </span>
@@ -1194,3 +1374,42 @@ class MultipleNestedListTestCase(_TranslationTestCase):
 
         xml = DXB.xml(lis)
         return xml
+
+
+class ManyRunsWithFontSizesTestCase(_TranslationTestCase):
+    expected_output = ''
+    run_expected_output = False
+    # The paragraphs use style0 (see DXB.p_tag), which the style template
+    # gives a size of 24, so each run is smaller than its paragraph
+    styles_xml = DXB.styles_xml([DXB.style('style0', 'Normal')])
+
+    def get_xml(self):
+        # 5,000 runs, each with a size and position of its own (so each is
+        # checked for faked superscript)
+        run = (
+            '<w:r><w:rPr><w:position w:val="4"/><w:sz w:val="19"/></w:rPr>'
+            '<w:t>AAA</w:t></w:r>'
+        )
+        paragraph = DXB.p_tag([run] * 100).decode('utf-8')
+        body = (paragraph * 50).encode('utf-8')
+        xml = DXB.xml(body)
+        return xml
+
+    def test_performance(self):
+        with self.toggle_run_expected_output():
+            start_time = time.time()
+            try:
+                self.test_expected_output()
+            except AssertionError:
+                pass
+            end_time = time.time()
+            total_time = end_time - start_time
+            # This finishes in under a second on python 2.7
+            expected_time = 3
+            if sys.version_info[0] == 3:
+                expected_time = 5  # Slower on python 3
+            error_message = 'Total time: %s; Expected time: %d' % (
+                total_time,
+                expected_time,
+            )
+            assert total_time < expected_time, error_message
@@ -0,0 +1,67 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import os
+from unittest import TestCase
+
+from nose import SkipTest
+
+try:
+    from cString import StringIO
+    BytesIO = StringIO
+except ImportError:
+    from io import BytesIO
+
+from pydocx.util.buffer import (
+    HAS_MEMORYVIEW,
+    MemoryViewReader,
+    is_buffer,
+    is_seekable,
+    spool,
+)
+
+
+class NonSeekableStream(object):
+    def __init__(self, data):
+        self.stream = BytesIO(data)
+
+    def read(self, size=-1):
+        return self.stream.read(size)
+
+
+class MemoryViewReaderTestCase(TestCase):
+    def setUp(self):
+        if not HAS_MEMORYVIEW:
+            raise SkipTest('memoryview is not available')
+
+    def test_read_and_seek(self):
+        reader = MemoryViewReader(b'hello world')
+        self.assertEqual(reader.read(5), b'hello')
+        self.assertEqual(reader.seek(-5, os.SEEK_END), 6)
+        self.assertEqual(reader.read(), b'world')
+        self.assertEqual(reader.getbuffer().tobytes(), b'hello world')
+
+    def test_memoryviews_are_buffers(self):
+        assert is_buffer(memoryview(b'PK'))
+
+
+class SpoolTestCase(TestCase):
+    def test_small_streams_are_spooled_in_memory(self):
+        result = spool(NonSeekableStream(b'abc' * 10))
+        if HAS_MEMORYVIEW:
+            assert isinstance(result, memoryview)
+            result = MemoryViewReader(result)
+        self.assertEqual(result.read(), b'abc' * 10)
+
+    def test_large_streams_roll_over_to_a_file(self):
+        result = spool(NonSeekableStream(b'abc' * 10), max_size=16)
+        assert is_seekable(result)
+        self.assertEqual(result.read(), b'abc' * 10)
+        result.close()
+
+    def test_is_seekable(self):
+        assert is_seekable(BytesIO(b'abc'))
+        assert not is_seekable(NonSeekableStream(b'abc'))
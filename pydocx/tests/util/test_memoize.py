@@ -0,0 +1,63 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+from unittest import TestCase
+
+from pydocx.util.memoize import MulitMemoize, MulitMemoizeMixin
+from pydocx.util.xml import parse_xml_from_string
+
+
+class MulitMemoizeTestCase(TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def children(el):
+            self.calls.append(el)
+            return list(el)
+
+        self.memoize = MulitMemoize(
+            {'children': children},
+            max_sizes={'children': 2},
+        )
+        root = parse_xml_from_string(b'<a><b/><c/><d/></a>')
+        self.elements = [root] + list(root)
+
+    def test_results_are_cached_by_element(self):
+        root = self.elements[0]
+        self.assertEqual(self.memoize('children', root), list(root))
+        self.assertEqual(self.memoize('children', root), list(root))
+        self.assertEqual(self.calls, [root])
+        stats = self.memoize.stats()['children']
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_least_recently_used_results_are_evicted(self):
+        a, b, c, d = self.elements
+        self.memoize('children', a)
+        self.memoize('children', b)
+        self.memoize('children', a)
+        self.memoize('children', c)
+        stats = self.memoize.stats()['children']
+        self.assertEqual(stats['evictions'], 1)
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['max_entries'], 2)
+        self.memoize('children', a)
+        self.memoize('children', b)
+        self.assertEqual(self.calls, [a, b, c, b])
+
+    def test_unhashable_arguments_are_not_cached(self):
+        def total(values):
+            self.calls.append(values)
+            return sum(values)
+
+        memoize = MulitMemoize({'total': total})
+        self.assertEqual(memoize('total', [1, 2]), 3)
+        self.assertEqual(memoize('total', [1, 2]), 3)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(memoize.stats()['total']['misses'], 2)
+
+    def test_mixin_stats_before_memoization_is_populated(self):
+        self.assertEqual(MulitMemoizeMixin().memoization_stats(), {})
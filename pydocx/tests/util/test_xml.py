@@ -4,18 +4,28 @@ from __future__ import (
     unicode_literals,
 )
 
+import sys
+import time
+from io import BytesIO
 from unittest import TestCase
 from xml.etree import cElementTree
 
+from nose import SkipTest
+
 from pydocx.exceptions import MalformedDocxException
 from pydocx.util.xml import (
+    TagIndex,
     el_iter,
     find_all,
     find_first,
+    get_xml_engine,
+    iter_body_children,
+    parse_xml_from_string,
     remove_namespaces,
     xml_tag_split,
     XmlNamespaceManager,
 )
+from pydocx.wordml import WordprocessingDocument
 
 
 def elements_to_tags(elements):
@@ -98,11 +108,178 @@ class UtilsTestCase(TestCase):
             lambda: remove_namespaces('foo')
         )
 
+    def test_parse_xml_from_string_strips_namespaces(self):
+        xml = b'''<?xml version="1.0"?>
+            <w:one xmlns:w="foo" xmlns:r="bar">
+                <w:two w:val="1" r:id="rId1"><w:t xml:space="preserve"> a </w:t>b</w:two>
+            </w:one>
+        '''  # noqa
+        root = parse_xml_from_string(xml)
+        self.assertEqual(
+            list(elements_to_tags(el_iter(root))),
+            ['one', 'two', 't'],
+        )
+        two = root[0]
+        self.assertEqual(two.attrib, {'val': '1', 'id': 'rId1'})
+        self.assertEqual(two[0].attrib, {'space': 'preserve'})
+        self.assertEqual(two[0].text, ' a ')
+        self.assertEqual(two[0].tail, 'b')
+        self.assertEqual(
+            cElementTree.tostring(root, encoding='utf-8'),
+            remove_namespaces(xml),
+        )
+
+    def test_parse_xml_from_string_junk_xml_causes_malformed_exception(self):
+        self.assertRaises(
+            MalformedDocxException,
+            lambda: parse_xml_from_string(b'<one><two></one>')
+        )
+
+    def test_iter_body_children(self):
+        xml = b'''<?xml version="1.0"?>
+            <w:document xmlns:w="foo">
+                <w:background/>
+                <w:body>
+                    <w:p><w:r><w:t>a</w:t></w:r></w:p>
+                    <w:tbl><w:tr><w:tc><w:p/></w:tc></w:tr></w:tbl>
+                    <w:sectPr/>
+                </w:body>
+            </w:document>
+        '''
+        children = list(iter_body_children(BytesIO(xml), chunk_size=16))
+        self.assertEqual(
+            list(elements_to_tags(children)),
+            ['p', 'tbl', 'sectPr'],
+        )
+        self.assertEqual(find_first(children[0], 't').text, 'a')
+        self.assertEqual(len(find_all(children[1], 'p')), 1)
+
+    def test_iter_body_children_junk_xml_causes_malformed_exception(self):
+        self.assertRaises(
+            MalformedDocxException,
+            lambda: list(iter_body_children(BytesIO(b'<document><body>'))),
+        )
+
     def test_xml_tag_split(self):
         self.assertEqual(xml_tag_split('{foo}bar'), ('foo', 'bar'))
         self.assertEqual(xml_tag_split('bar'), (None, 'bar'))
 
 
+class TagIndexTestCase(TestCase):
+    def setUp(self):
+        document = WordprocessingDocument(
+            path='pydocx/fixtures/nested_table_rowspan.docx',
+        )
+        self.root = document.main_document_part.root_element
+        self.index = TagIndex(self.root)
+
+    def test_matches_subtree_searches(self):
+        tags = set(el.tag for el in el_iter(self.root))
+        for el in el_iter(self.root):
+            for tag in tags:
+                self.assertEqual(
+                    self.index.find_all(el, tag),
+                    find_all(el, tag),
+                )
+                self.assertTrue(
+                    self.index.find_first(el, tag) is find_first(el, tag),
+                )
+
+    def test_unknown_tag(self):
+        self.assertEqual(self.index.find_all(self.root, 'foo'), [])
+        self.assertEqual(self.index.find_first(self.root, 'foo'), None)
+        assert not self.index.has_descendant_with_tag(self.root, 'foo')
+
+    def test_elements_outside_of_the_index_are_searched(self):
+        root = make_xml(b'<one><two><three/></two></one>')
+        self.assertEqual(
+            list(elements_to_tags(self.index.find_all(root, 'three'))),
+            ['three'],
+        )
+        assert self.index.has_descendant_with_tag(root, 'two')
+        self.assertEqual(TagIndex().find_first(root, 'two'), root[0])
+
+
+class XmlEngineTestCase(TestCase):
+    def setUp(self):
+        try:
+            self.lxml = get_xml_engine('lxml')
+        except ImportError:
+            raise SkipTest('lxml is not installed')
+        self.etree = get_xml_engine('etree')
+
+    def make_document(self, paragraph_count):
+        paragraph = '''
+            <w:p>
+                <w:pPr><w:pStyle w:val="Normal"/></w:pPr>
+                <w:r>
+                    <w:rPr><w:b/><w:sz w:val="24"/></w:rPr>
+                    <w:t xml:space="preserve"> Paragraph {i} </w:t>
+                </w:r>
+            </w:p>
+        '''
+        xml = '<w:document xmlns:w="foo"><w:body>{body}</w:body></w:document>'
+        return xml.format(body=''.join(
+            paragraph.format(i=i)
+            for i in range(paragraph_count)
+        )).encode('utf-8')
+
+    def to_tuples(self, el):
+        return (
+            el.tag,
+            sorted(el.attrib.items()),
+            el.text,
+            el.tail,
+            [self.to_tuples(child) for child in el],
+        )
+
+    def test_unknown_engine(self):
+        self.assertRaises(ValueError, lambda: get_xml_engine('expat'))
+
+    def test_engines_build_identical_trees(self):
+        xml = self.make_document(paragraph_count=10)
+        self.assertEqual(
+            self.to_tuples(parse_xml_from_string(xml, engine=self.etree)),
+            self.to_tuples(parse_xml_from_string(xml, engine=self.lxml)),
+        )
+
+    def test_lxml_get_parent(self):
+        root = parse_xml_from_string(b'<a><b><c/></b></a>', engine=self.lxml)
+        b = root[0]
+        c = b[0]
+        self.assertTrue(self.lxml.get_parent(c, root) is b)
+        self.assertTrue(self.lxml.get_parent(b, root) is root)
+        self.assertEqual(self.lxml.get_parent(root, root), None)
+        # Only parents within the tree under `root` are returned
+        self.assertEqual(self.lxml.get_parent(c, b), None)
+
+    def test_lxml_junk_xml_causes_malformed_exception(self):
+        self.assertRaises(
+            MalformedDocxException,
+            lambda: parse_xml_from_string(b'<one><two></one>', self.lxml),
+        )
+
+    def test_large_document_smoke(self):
+        # Only checks that neither engine is pathologically slow, it doesn't
+        # compare them with each other
+        xml = self.make_document(paragraph_count=20000)
+        for engine in (self.etree, self.lxml):
+            start_time = time.time()
+            parse_xml_from_string(xml, engine=engine)
+            end_time = time.time()
+            total_time = end_time - start_time
+            # Each engine takes under a second on python 2.7
+            expected_time = 3
+            if sys.version_info[0] == 3:
+                expected_time = 5  # Slower on python 3
+            error_message = '%s: Total time: %s; Expected time: %d' % (
+                engine.name,
+                total_time,
+                expected_time,
+            )
+            assert total_time < expected_time, error_message
+
+
 class XmlNamespaceManagerTestCase(TestCase):
     def test_namespace_manager(self):
         xml = '''<?xml version="1.0" encoding="UTF-8"?>
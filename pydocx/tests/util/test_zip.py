@@ -0,0 +1,60 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import zipfile
+from unittest import TestCase
+
+try:
+    from cString import StringIO
+    BytesIO = StringIO
+except ImportError:
+    from io import BytesIO
+
+from pydocx.exceptions import MalformedDocxException
+from pydocx.util.zip import iter_member_from_buffer
+
+
+class IterMemberFromBufferTestCase(TestCase):
+    data = b''.join(
+        '<p>Paragraph {i}</p>'.format(i=i).encode('utf-8')
+        for i in range(1000)
+    )
+
+    def _create_archive(self, compress_type):
+        archive = BytesIO()
+        f = zipfile.ZipFile(archive, 'w', compress_type)
+        f.writestr('word/document.xml', self.data)
+        f.close()
+        data = archive.getvalue()
+        f = zipfile.ZipFile(BytesIO(data))
+        member = f.getinfo('word/document.xml')
+        f.close()
+        return memoryview(data), member
+
+    def test_deflated_members_are_inflated_in_chunks(self):
+        buf, member = self._create_archive(zipfile.ZIP_DEFLATED)
+        # The compressed data is fed in more than one chunk as well
+        assert member.compress_size > 100
+        chunks = list(iter_member_from_buffer(buf, member, chunk_size=100))
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 100 for chunk in chunks)
+        self.assertEqual(b''.join(chunks), self.data)
+
+    def test_stored_members_are_a_single_view(self):
+        buf, member = self._create_archive(zipfile.ZIP_STORED)
+        chunks = list(iter_member_from_buffer(buf, member, chunk_size=100))
+        self.assertEqual(len(chunks), 1)
+        assert isinstance(chunks[0], memoryview)
+        self.assertEqual(chunks[0].tobytes(), self.data)
+
+    def test_corrupt_members_are_malformed(self):
+        buf, member = self._create_archive(zipfile.ZIP_DEFLATED)
+        member.CRC ^= 1
+        self.assertRaises(
+            MalformedDocxException,
+            list,
+            iter_member_from_buffer(buf, member, chunk_size=100),
+        )
@@ -0,0 +1,192 @@
+from __future__ import (
+    absolute_import,
+    print_function,
+    unicode_literals,
+)
+
+import mmap
+import os
+import sys
+from tempfile import TemporaryFile
+
+try:
+    from cString import StringIO
+    BytesIO = StringIO
+except ImportError:
+    from io import BytesIO
+
+# Non-seekable input streams are spooled into memory, and only rolled over to
+# a temporary file once they grow beyond this many bytes.
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+SPOOL_CHUNK_SIZE = 64 * 1024
+
+# Every ZIP archive starts with the signature of a local file header
+ZIP_SIGNATURE = b'PK\x03\x04'
+
+# Python 2's memory maps only support the old buffer interface, so they can't
+# be wrapped in a memoryview.
+MMAP_SUPPORTS_MEMORYVIEW = sys.version_info[0] >= 3
+
+try:
+    memoryview
+except NameError:
+    # Python 2.6 has no memoryview, so in-memory documents are copied into a
+    # BytesIO instead of being read in place.
+    HAS_MEMORYVIEW = False
+    BUFFER_TYPES = (bytearray,)
+else:
+    HAS_MEMORYVIEW = True
+    BUFFER_TYPES = (bytearray, memoryview)
+
+
+class MemoryViewReader(object):
+    '''
+    A read-only, seekable file-like object backed by a buffer (bytes, a
+    memoryview, a memory map...).
+
+    Unlike BytesIO, constructing the reader never copies the underlying data.
+    `getbuffer` exposes the data as a memoryview, and `read` only copies the
+    bytes that are actually requested. Not available on python 2.6, see
+    `HAS_MEMORYVIEW`.
+    '''
+
+    def __init__(self, buf):
+        self.buffer = memoryview(buf)
+        self.position = 0
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def read(self, size=-1):
+        start = self.position
+        if size is None or size < 0:
+            end = len(self.buffer)
+        else:
+            end = min(start + size, len(self.buffer))
+        self.position = max(start, end)
+        return self.buffer[start:end].tobytes()
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self.position + offset
+        elif whence == os.SEEK_END:
+            position = len(self.buffer) + offset
+        else:
+            raise ValueError('Invalid whence ({whence})'.format(
+                whence=whence,
+            ))
+        if position < 0:
+            raise ValueError('Negative seek position')
+        self.position = position
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def getbuffer(self):
+        return self.buffer
+
+    def close(self):
+        release = getattr(self.buffer, 'release', None)
+        if callable(release):
+            release()
+
+
+def map_file(path_or_file):
+    '''
+    Return a read-only memory map of the given path or open file object, or
+    None if it cannot be mapped (in-memory file objects, empty files,
+    platforms without mmap support for the file, or python 2).
+    '''
+    if not MMAP_SUPPORTS_MEMORYVIEW:
+        return None
+    if hasattr(path_or_file, 'read'):
+        try:
+            fileno = path_or_file.fileno()
+        except (AttributeError, IOError, OSError, ValueError):
+            return None
+        return _map_fileno(fileno)
+    with open(path_or_file, 'rb') as f:
+        return _map_fileno(f.fileno())
+
+
+def _map_fileno(fileno):
+    try:
+        return mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except (EnvironmentError, ValueError):
+        return None
+
+
+def is_buffer(obj):
+    '''
+    Return True if `obj` holds the document data itself rather than naming or
+    wrapping it. On python 2 `bytes` is `str`, which is also used for paths,
+    so there a string is only treated as data if it starts with the signature
+    of a ZIP archive, which no path does.
+
+    >>> is_buffer(bytearray(b'PK'))
+    True
+    >>> is_buffer(b'PK\\x03\\x04')
+    True
+    >>> is_buffer('file.docx')
+    False
+    '''
+    if isinstance(obj, BUFFER_TYPES):
+        return True
+    if not isinstance(obj, bytes):
+        return False
+    return not isinstance(obj, str) or obj.startswith(ZIP_SIGNATURE)
+
+
+def is_seekable(f):
+    '''
+    Return True if the file-like object `f` supports random access.
+    '''
+    seekable = getattr(f, 'seekable', None)
+    if callable(seekable):
+        try:
+            return bool(seekable())
+        except (IOError, OSError, ValueError):
+            return False
+    if not hasattr(f, 'seek') or not hasattr(f, 'tell'):
+        return False
+    try:
+        f.tell()
+    except (IOError, OSError, ValueError):
+        return False
+    return True
+
+
+def spool(stream, max_size=SPOOL_MAX_SIZE):
+    '''
+    Read a non-seekable stream to the end so that it can be randomly accessed.
+
+    The data is kept in memory, and returned as a memoryview, unless it grows
+    beyond `max_size` bytes in which case it is rolled over to an anonymous
+    temporary file which is returned instead. Without memoryview (python 2.6)
+    the in-memory BytesIO is returned.
+    '''
+    spooled = BytesIO()
+    rolled_over = False
+    for chunk in iter(lambda: stream.read(SPOOL_CHUNK_SIZE), b''):
+        spooled.write(chunk)
+        if not rolled_over and spooled.tell() > max_size:
+            rolled = TemporaryFile()
+            rolled.write(spooled.getvalue())
+            spooled = rolled
+            rolled_over = True
+    if rolled_over or not HAS_MEMORYVIEW:
+        spooled.seek(0)
+        return spooled
+    getbuffer = getattr(spooled, 'getbuffer', None)
+    if callable(getbuffer):
+        return getbuffer()
+    return memoryview(spooled.getvalue())
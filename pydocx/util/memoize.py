@@ -4,7 +4,11 @@ from __future__ import (
     unicode_literals,
 )
 
-from collections import Hashable
+# The number of results kept for each memoized function, unless a different
+# limit is given for it
+DEFAULT_MAX_SIZE = 1024
+
+_missing = object()
 
 
 class MulitMemoize(object):
@@ -14,22 +18,60 @@ class MulitMemoize(object):
         'find_all': find_all,
         ...
     }
+
+    The results of each function are kept in an LRUCache of their own, which
+    holds at most `max_sizes[func_name]` (or `default_max_size`) of them. The
+    arguments are the key, so elements are matched by identity.
     '''
-    def __init__(self, func_names):
-        self.cache = dict((func_name, {}) for func_name in func_names)
+    def __init__(
+            self,
+            func_names,
+            max_sizes=None,
+            default_max_size=DEFAULT_MAX_SIZE):
+        if max_sizes is None:
+            max_sizes = {}
+        self.cache = dict(
+            (func_name, LRUCache(
+                max_size=max_sizes.get(func_name, default_max_size),
+            ))
+            for func_name in func_names
+        )
         self.func_names = func_names
 
     def __call__(self, func_name, *args):
-        if not isinstance(args, Hashable):
+        cache = self.cache[func_name]
+        try:
+            hash(args)
+        except TypeError:
             # uncacheable. a list, for instance.
             # better to not cache than blow up.
+            cache.misses += 1
             return self.func_names[func_name](*args)
-        if args in self.cache[func_name]:
-            return self.cache[func_name][args]
-        else:
+        value = cache.get(args, _missing)
+        if value is _missing:
             value = self.func_names[func_name](*args)
-            self.cache[func_name][args] = value
-            return value
+            cache[args] = value
+        return value
+
+    def stats(self):
+        '''
+        Return the hits, misses and evictions of the cache of each function,
+        by function name.
+        '''
+        return dict(
+            (func_name, dict(
+                hits=cache.hits,
+                misses=cache.misses,
+                evictions=cache.evictions,
+                entries=len(cache),
+                max_entries=cache.max_size,
+            ))
+            for func_name, cache in self.cache.items()
+        )
+
+    def clear(self):
+        for cache in self.cache.values():
+            cache.clear()
 
 
 class MulitMemoizeMixin(object):
@@ -40,5 +82,94 @@ class MulitMemoizeMixin(object):
     def memod_tree_op(self, func_name, *args):
         return self._memoization(func_name, *args)
 
-    def populate_memoization(self, func_names):
-        self._memoization = MulitMemoize(func_names)
+    def populate_memoization(self, func_names, max_sizes=None):
+        self._memoization = MulitMemoize(func_names, max_sizes=max_sizes)
+
+    def memoization_stats(self):
+        if self._memoization is None:
+            return {}
+        return self._memoization.stats()
+
+
+class LRUCache(object):
+    '''
+    A mapping that holds at most `max_size` items, evicting the least recently
+    used item to make room for new ones.
+
+    >>> cache = LRUCache(max_size=2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache.get('a')
+    1
+    >>> cache['c'] = 3
+    >>> 'b' in cache
+    False
+    >>> sorted(cache.keys()) == ['a', 'c']
+    True
+    '''
+
+    # Indexes into each link of the doubly linked list, which is ordered from
+    # the least to the most recently used item
+    PREV, NEXT, KEY, VALUE = 0, 1, 2, 3
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._links = {}
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+
+    def __len__(self):
+        return len(self._links)
+
+    def __contains__(self, key):
+        return key in self._links
+
+    def keys(self):
+        return list(self._links.keys())
+
+    def _unlink(self, link):
+        link_prev, link_next = link[self.PREV], link[self.NEXT]
+        link_prev[self.NEXT] = link_next
+        link_next[self.PREV] = link_prev
+
+    def _append(self, link):
+        last = self._root[self.PREV]
+        link[self.PREV] = last
+        link[self.NEXT] = self._root
+        last[self.NEXT] = link
+        self._root[self.PREV] = link
+
+    def get(self, key, default=None):
+        link = self._links.get(key)
+        if link is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._unlink(link)
+        self._append(link)
+        return link[self.VALUE]
+
+    def __setitem__(self, key, value):
+        link = self._links.get(key)
+        if link is not None:
+            link[self.VALUE] = value
+            self._unlink(link)
+            self._append(link)
+            return
+        if self.max_size is not None and len(self._links) >= self.max_size:
+            if not self._links:
+                return
+            oldest = self._root[self.NEXT]
+            self._unlink(oldest)
+            del self._links[oldest[self.KEY]]
+            self.evictions += 1
+        link = [None, None, key, value]
+        self._append(link)
+        self._links[key] = link
+
+    def clear(self):
+        self._links.clear()
+        self._root[:] = [self._root, self._root, None, None]
@@ -4,34 +4,61 @@ from __future__ import (
     unicode_literals,
 )
 
+from array import array
 from collections import defaultdict
 
 from pydocx.constants import (
     UPPER_ROMAN_TO_HEADING_VALUE,
     TAGS_HOLDING_CONTENT_TAGS,
+    HEADING_TAGS_BY_STYLE_NAME,
     TAGS_CONTAINING_CONTENT,
 )
-from pydocx.util.memoize import MulitMemoizeMixin
-from pydocx.util.xml import (
-    filter_children,
-    find_first,
-    find_all,
-    find_ancestor_with_tag,
-    get_list_style,
-    has_descendant_with_tag,
+from pydocx.models.numbering import Numbering
+from pydocx.models.table import TableGrid
+from pydocx.util.xml import TagIndex, find_ancestor_with_tag
+
+# The tags that change what is recorded about the elements beneath them while
+# walking the tree
+TAGS_CHANGING_CONTEXT = frozenset([
+    'body',
+    'numId',
+    'p',
+    'tbl',
+    'tc',
+    'tr',
+])
+
+# The tags that get a bit in the flags recorded for each element, saying which
+# of them occur anywhere beneath it
+DESCENDANT_TAG_FLAGS = dict(
+    (tag, 1 << bit)
+    for bit, tag in enumerate(TAGS_CONTAINING_CONTENT + ('smartTag',))
 )
+CONTENT_FLAGS = sum(
+    DESCENDANT_TAG_FLAGS[tag] for tag in TAGS_CONTAINING_CONTENT
+)
+
+
+class NamespacedNumId(tuple):
+    '''
+    The numId of a list, along with the number of tables the list is in (see
+    `PydocxPreProcessor._generate_num_id`).
 
+    It compares and hashes as the `(num_id, num_tables)` tuple it is, so it
+    can be used in sets and as a dict key. The pre-processor hands out a
+    single instance for each distinct value.
+    '''
 
-class NamespacedNumId(object):
-    def __init__(self, num_id, num_tables, *args, **kwargs):
-        self._num_id = num_id
-        self._num_tables = num_tables
+    __slots__ = ()
+
+    def __new__(cls, num_id, num_tables, *args, **kwargs):
+        return tuple.__new__(cls, (num_id, num_tables))
+
+    def __getnewargs__(self):
+        return tuple(self)
 
     def __unicode__(self, *args, **kwargs):
-        return '%s:%d' % (
-            self._num_id,
-            self._num_tables,
-        )
+        return '%s:%d' % self
 
     def __str__(self, *args, **kwargs):
         return self.__unicode__(*args, **kwargs)
@@ -39,270 +66,672 @@ class NamespacedNumId(object):
     def __repr__(self, *args, **kwargs):
         return self.__unicode__(*args, **kwargs)
 
-    def __eq__(self, other):
-        if other is None:
-            return False
-        return repr(self) == repr(other)
-
     def __ne__(self, other):
+        # A num id has never been considered to differ from None
         if other is None:
             return False
-        return repr(self) != repr(other)
+        return tuple.__ne__(self, other)
 
     @property
     def num_id(self):
-        return self._num_id
+        return self[0]
+
+    @property
+    def num_tables(self):
+        return self[1]
+
+
+# The flags recorded for each element, and the bit of each
+META_DATA_FLAGS = dict(
+    (name, 1 << bit)
+    for bit, name in enumerate([
+        'is_list_item',
+        'is_first_list_item',
+        'is_last_list_item_in_root',
+        'is_in_table',
+        'vmerge_continue',
+    ])
+)
+
+
+class ElementMetaData(object):
+    '''
+    What the pre-processor records about the elements of a tree, held in
+    arrays indexed by the position of each element in document order (its
+    ordinal in the tree's TagIndex) instead of in a dict for every element.
+
+    The `META_DATA_FLAGS` of an element are the bits of a single byte. Other
+    elements it refers to, such as its parent, are stored as their ordinals
+    and indexes as they are, in arrays that are only created once something
+    is stored in them. The values that only list items and headings have are
+    kept in dicts by ordinal.
+
+    Nothing can be recorded about elements outside of the tree.
+    '''
+
+    def __init__(self, elements=None, ordinals=None, **columns):
+        '''
+        `columns` may pass in arrays of ordinals or indexes that were built
+        while walking the tree, by name.
+        '''
+        if elements is None:
+            elements = []
+        if ordinals is None:
+            ordinals = dict(zip(elements, range(len(elements))))
+        self.elements = elements
+        self.ordinals = ordinals
+        self.flags = array('B', [0]) * len(elements)
+        self.columns = columns
+        self.values = {}
+
+    def _get_column(self, name):
+        column = self.columns.get(name)
+        if column is None:
+            column = array('i', [-1]) * len(self.elements)
+            self.columns[name] = column
+        return column
+
+    def get_flag(self, el, name):
+        ordinal = self.ordinals.get(el)
+        if ordinal is None:
+            return False
+        return bool(self.flags[ordinal] & META_DATA_FLAGS[name])
+
+    def set_flag(self, el, name, value=True):
+        ordinal = self.ordinals[el]
+        if value:
+            self.flags[ordinal] |= META_DATA_FLAGS[name]
+        else:
+            self.flags[ordinal] &= 0xff ^ META_DATA_FLAGS[name]
+
+    def get_index(self, el, name):
+        ordinal = self.ordinals.get(el)
+        column = self.columns.get(name)
+        if ordinal is None or column is None or column[ordinal] < 0:
+            return None
+        return column[ordinal]
+
+    def set_index(self, el, name, index):
+        if index is None:
+            index = -1
+        self._get_column(name)[self.ordinals[el]] = index
 
-    def __hash__(self):
-        return id(str(self))
+    def get_element(self, el, name):
+        index = self.get_index(el, name)
+        if index is None:
+            return None
+        return self.elements[index]
+
+    def set_element(self, el, name, other):
+        index = None
+        if other is not None:
+            index = self.ordinals[other]
+        self.set_index(el, name, index)
+
+    def get_value(self, el, name):
+        ordinal = self.ordinals.get(el)
+        values = self.values.get(name)
+        if ordinal is None or values is None:
+            return None
+        return values.get(ordinal)
+
+    def set_value(self, el, name, value):
+        values = self.values.get(name)
+        if values is None:
+            values = self.values[name] = {}
+        values[self.ordinals[el]] = value
 
 
-class PydocxPreProcessor(MulitMemoizeMixin):
+class PydocxPreProcessor(object):
     def __init__(
             self,
             convert_root_level_upper_roman=False,
             styles=None,
             numbering_root=None,
+            numbering=None,
+            lowest_ilvl=None,
+            xml_engine=None,
             *args, **kwargs):
-        self.meta_data = defaultdict(dict)
+        self.meta_data = ElementMetaData()
         self.convert_root_level_upper_roman = convert_root_level_upper_roman
         self.styles = styles
         self.numbering_root = numbering_root
+        if numbering is None and numbering_root is not None:
+            numbering = Numbering.load(numbering_root)
+        self.numbering = numbering
+        self._upper_roman_num_ids = None
+        # The lowest ilvl of any list item in the document. Only needs to be
+        # passed in when `root` is just a part of the document.
+        self.lowest_ilvl = lowest_ilvl
+        # Engines whose elements know their parent don't need the parents
+        # recorded in `meta_data`.
+        self.xml_engine = xml_engine
+        self.root = None
+        self.tag_index = TagIndex()
+        self.body = None
+        self._numbered_paragraphs = []
+        self._table_cells = []
+        self._content_children = []
+        self._table_depths = array('i')
+        self._descendant_tag_flags = array('B')
+        # The NamespacedNumId for each `(num_id, num_tables)` seen so far
+        self._num_ids = {}
 
     def perform_pre_processing(self, root, *args, **kwargs):
-        self.populate_memoization({
-            'find_first': find_first,
-        })
-        self._add_parent(root)
+        self._index_tree(root)
         # If we don't have a numbering root there cannot be any lists.
         if self.numbering_root is not None:
-            self._set_list_attributes(root)
-        self._set_table_attributes(root)
-        self._set_is_in_table(root)
+            self._set_list_attributes()
+        self._set_table_attributes()
+        self._set_next()
 
-        body = find_first(root, 'body')
-        self._set_next(body)
+        body = self.body
         p_elements = [
-            child for child in find_all(body, 'p')
+            child for child in self.find_all(body, 'p')
         ]
         list_elements = [
             child for child in p_elements
             if self.is_list_item(child)
         ]
         # Find the first and last li elements
-        num_ids = set([self.num_id(i) for i in list_elements])
-        ilvls = set([self.ilvl(i) for i in list_elements])
-        self._set_first_list_item(num_ids, ilvls, list_elements)
-        self._set_last_list_item(num_ids, list_elements)
+        self._set_first_list_item(self._group_list_items(list_elements))
+        self._set_last_list_item(list_elements)
 
         self._set_headers(p_elements)
         self._convert_upper_roman(body)
 
+    def find_list_items(self, root):
+        '''
+        Return the `(paragraph, num_id, ilvl)` of each list item beneath
+        `root`, in document order, without indexing the tree or keeping any
+        state other than the interned num ids. Headings and root level upper
+        roman lists are still included, see `is_kept_list_item`.
+        '''
+        if self.numbering_root is None:
+            return []
+        # The same paragraphs as the numbered paragraphs found by
+        # `_index_tree`, along with the number of tables they are in
+        numbered_paragraphs = []
+        paragraph = root if root.tag == 'p' else None
+        stack = [(iter(root), paragraph, 0)]
+        while stack:
+            children, paragraph, tables = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+            tag = child.tag
+            if tag == 'numId':
+                if paragraph is not None and (
+                        not numbered_paragraphs or
+                        numbered_paragraphs[-1][0] is not paragraph):
+                    numbered_paragraphs.append((paragraph, tables))
+            elif len(child):
+                if tag == 'p':
+                    stack.append((iter(child), child, tables))
+                elif tag == 'tbl':
+                    stack.append((iter(child), paragraph, tables + 1))
+                else:
+                    stack.append((iter(child), paragraph, tables))
+
+        list_items = []
+        for paragraph, num_tables in numbered_paragraphs:
+            ilvl = self.find_first(paragraph, 'ilvl')
+            # Deleted text in a list will have a numId but no ilvl.
+            if ilvl is None:
+                continue
+            list_items.append((
+                paragraph,
+                self._generate_num_id(paragraph, num_tables),
+                ilvl.attrib['val'],
+            ))
+        return list_items
+
+    def is_kept_list_item(self, paragraph, num_id, ilvl):
+        '''
+        Return False if the list item `paragraph` may stop being a list item
+        once the tree is pre-processed, because it is a heading, or because it
+        may be in a root level upper roman list that is converted to headings.
+        '''
+        if self.find_heading_level(paragraph):
+            return False
+        if not self.convert_root_level_upper_roman:
+            return True
+        if self.numbering is None:
+            return True
+        # Which level of the list ends up converted depends on the ilvl of
+        # its first root level item, so any upper roman level counts.
+        return num_id.num_id not in self._get_upper_roman_num_ids()
+
+    def _get_upper_roman_num_ids(self):
+        if self._upper_roman_num_ids is None:
+            self._upper_roman_num_ids = set(
+                num_id
+                for (num_id, _), level in self.numbering.levels.items()
+                if level.num_format == 'upperRoman'
+            )
+        return self._upper_roman_num_ids
+
+    def find_heading_level(self, paragraph):
+        '''
+        Return the heading tag for the style of `paragraph`, or None if it
+        isn't styled as a heading.
+        '''
+        # This element is using the default style which is not a heading.
+        p_style = self.find_first(paragraph, 'pStyle')
+        if p_style is None:
+            return None
+        style = p_style.attrib.get('val', '')
+        style = self.styles.get_styles_by_type('paragraph').get(style)
+        if style is None:
+            return None
+        return HEADING_TAGS_BY_STYLE_NAME.get(style.name.lower())
+
     def is_first_list_item(self, el):
-        return self.meta_data[el].get('is_first_list_item', False)
+        return self.meta_data.get_flag(el, 'is_first_list_item')
 
     def is_last_list_item_in_root(self, el):
-        return self.meta_data[el].get('is_last_list_item_in_root', False)
+        return self.meta_data.get_flag(el, 'is_last_list_item_in_root')
 
     def is_list_item(self, el):
-        return self.meta_data[el].get('is_list_item', False)
+        return self.meta_data.get_flag(el, 'is_list_item')
 
     def num_id(self, el):
         if not self.is_list_item(el):
             return None
-        return self.meta_data[el].get('num_id')
+        return self.meta_data.get_value(el, 'num_id')
 
     def ilvl(self, el):
         if not self.is_list_item(el):
             return None
-        return self.meta_data[el].get('ilvl')
+        return self.meta_data.get_value(el, 'ilvl')
 
     def heading_level(self, el):
-        return self.meta_data[el].get('heading_level')
+        return self.meta_data.get_value(el, 'heading_level')
 
     def is_in_table(self, el):
-        return self.meta_data[el].get('is_in_table')
+        return self.meta_data.get_flag(el, 'is_in_table')
 
     def row_index(self, el):
-        return self.meta_data[el].get('row_index')
+        return self.meta_data.get_index(el, 'row_index')
 
     def column_index(self, el):
-        return self.meta_data[el].get('column_index')
+        return self.meta_data.get_index(el, 'column_index')
+
+    def grid_column(self, el):
+        return self.meta_data.get_index(el, 'grid_column')
+
+    def rowspan(self, el):
+        return self.meta_data.get_index(el, 'rowspan')
 
     def vmerge_continue(self, el):
-        return self.meta_data[el].get('vmerge_continue')
+        return self.meta_data.get_flag(el, 'vmerge_continue')
 
     def next(self, el):
-        if el not in self.meta_data:
-            return
-        return self.meta_data[el].get('next')
+        return self.meta_data.get_element(el, 'next')
 
     def previous(self, el):
-        if el not in self.meta_data:
-            return
-        return self.meta_data[el].get('previous')
+        return self.meta_data.get_element(el, 'previous')
 
     def parent(self, el):
-        return self.meta_data[el].get('parent')
+        if self.root is None:
+            return self.meta_data.get_element(el, 'parent')
+        return self.xml_engine.get_parent(el, self.root)
 
-    def _add_parent(self, el):  # if a parent, make that an attribute
-        for child in el.getchildren():
-            self.meta_data[child]['parent'] = el
-            self._add_parent(child)
+    def table(self, el):
+        '''
+        Return the innermost table that `el` is in, or None.
+        '''
+        if el in self.meta_data.ordinals:
+            return self.meta_data.get_element(el, 'table')
+        return find_ancestor_with_tag(self, el, 'tbl')
 
-    def _set_list_attributes(self, el):
-        list_elements = find_all(el, 'numId')
-        for li in list_elements:
-            parent = find_ancestor_with_tag(self, li, 'p')
-            # Deleted text in a list will have a numId but no ilvl.
-            if parent is None:
+    def table_cell(self, el):
+        '''
+        Return the innermost table cell that `el` is in, or None.
+        '''
+        if el in self.meta_data.ordinals:
+            return self.meta_data.get_element(el, 'table_cell')
+        return find_ancestor_with_tag(self, el, 'tc')
+
+    def table_depth(self, el):
+        '''
+        Return the number of tables that `el` is nested in, not counting the
+        root of the pre-processed tree.
+        '''
+        ordinal = self.tag_index.ordinals.get(el)
+        if ordinal is not None:
+            return self._table_depths[ordinal]
+        return 0
+
+    def find_first(self, el, tag):
+        return self.tag_index.find_first(el, tag)
+
+    def find_all(self, el, tag):
+        return self.tag_index.find_all(el, tag)
+
+    def has_descendant_with_tag(self, el, tag):
+        flag = DESCENDANT_TAG_FLAGS.get(tag)
+        if flag is not None:
+            ordinal = self.tag_index.ordinals.get(el)
+            if ordinal is not None:
+                return bool(self._descendant_tag_flags[ordinal] & flag)
+        return self.tag_index.has_descendant_with_tag(el, tag)
+
+    def has_content(self, el):
+        '''
+        Return True if any of the `TAGS_CONTAINING_CONTENT` is beneath `el`.
+        '''
+        ordinal = self.tag_index.ordinals.get(el)
+        if ordinal is not None:
+            return bool(self._descendant_tag_flags[ordinal] & CONTENT_FLAGS)
+        return any(
+            self.tag_index.has_descendant_with_tag(el, tag)
+            for tag in TAGS_CONTAINING_CONTENT
+        )
+
+    def _index_tree(self, root):
+        '''
+        Walk the tree under `root` once, depth first and without recursion,
+        building the tag index and recording everything the pre-processing
+        steps need to know about where each element sits: its parent, the
+        paragraph it is in, the table and table cell it is in and how many
+        tables it is nested in, the row and column of each table cell, and
+        which of the `DESCENDANT_TAG_FLAGS` tags are beneath it.
+        '''
+        record_parents = True
+        if self.xml_engine is not None and self.xml_engine.has_parents:
+            # The elements can return their parent themselves
+            self.root = root
+            record_parents = False
+
+        # Paragraphs that directly contain a numId (rather than through a
+        # nested paragraph), along with the number of tables they are in
+        self._numbered_paragraphs = numbered_paragraphs = []
+        self._table_cells = table_cells = []
+        # The position of each of those cells, and the paragraphs in cells
+        table_cell_positions = []
+        paragraphs_in_tables = []
+        # The children that may hold content, of the body and of each table
+        # cell within it
+        self._content_children = content_children = []
+        self.body = None
+
+        # What is known about the position of the elements beneath a given
+        # element: the innermost paragraph, the number of tables (not counting
+        # the root), the ordinals of the innermost table and table cell (or
+        # -1), whether they are in the body, the row index if the element is a
+        # row of a table, and the list to add the children that may hold
+        # content to if it is the body or a table cell within the body.
+        # Elements that don't change any of this share their parent's context.
+        root_tag = root.tag
+        context = (
+            root if root_tag == 'p' else None,
+            0,
+            0 if root_tag == 'tbl' else -1,
+            0 if root_tag == 'tc' else -1,
+            False,
+            None,
+            None,
+        )
+        # The tag index is built from the elements in document order, and the
+        # ordinal that follows the subtree of each element
+        elements = [root]
+        subtree_ends = array('i', [0])
+        # The ordinals of the parent and of the innermost table and table cell
+        # of each element, and the number of tables it is in, by ordinal
+        parents = array('i', [-1])
+        ancestor_tables = array('i', [-1])
+        ancestor_table_cells = array('i', [-1])
+        self._table_depths = table_depths = array('i', [0])
+        # The DESCENDANT_TAG_FLAGS of the tags beneath each element, by
+        # ordinal. They are known once the whole subtree has been walked.
+        self._descendant_tag_flags = descendant_tag_flags = array('B', [0])
+        # Each frame holds an element, an iterator over its children, its
+        # context, the number of rows or cells seen so far if it is a table or
+        # a row, its ordinal, and the flags of the tags seen beneath it so far.
+        stack = [[root, iter(root), context, 0, 0, 0]]
+        while stack:
+            frame = stack[-1]
+            child = next(frame[1], None)
+            if child is None:
+                stack.pop()
+                subtree_ends[frame[4]] = len(elements)
+                if frame[5]:
+                    descendant_tag_flags[frame[4]] = frame[5]
+                    if stack:
+                        stack[-1][5] |= frame[5]
                 continue
-            parent_ilvl = self.memod_tree_op('find_first', parent, 'ilvl')
-            if parent_ilvl is None:
+
+            parent = frame[0]
+            if record_parents:
+                parents.append(frame[4])
+            context = frame[2]
+            tag = child.tag
+            ancestor_tables.append(context[2])
+            ancestor_table_cells.append(context[3])
+            table_depths.append(context[1])
+            descendant_tag_flags.append(0)
+            if tag in DESCENDANT_TAG_FLAGS:
+                frame[5] |= DESCENDANT_TAG_FLAGS[tag]
+            if context[6] is not None and tag in TAGS_HOLDING_CONTENT_TAGS:
+                context[6].append(child)
+
+            if tag in TAGS_CHANGING_CONTEXT:
+                paragraph, tables, table, table_cell, in_body, _, _ = context
+                row_index = None
+                children = None
+                if tag == 'p':
+                    if table_cell >= 0:
+                        paragraphs_in_tables.append(child)
+                    paragraph = child
+                elif tag == 'numId':
+                    if paragraph is not None and (
+                            not numbered_paragraphs or
+                            numbered_paragraphs[-1][0] is not paragraph):
+                        numbered_paragraphs.append((paragraph, tables))
+                elif tag == 'tbl':
+                    tables += 1
+                    table = len(elements)
+                elif tag == 'tr':
+                    if parent.tag == 'tbl' and parent is not root:
+                        row_index = frame[3]
+                        frame[3] += 1
+                elif tag == 'tc':
+                    table_cell = len(elements)
+                    if context[5] is not None:
+                        table_cells.append(child)
+                        table_cell_positions.append((context[5], frame[3]))
+                        frame[3] += 1
+                    if in_body:
+                        children = []
+                        content_children.append(children)
+                elif self.body is None:
+                    in_body = True
+                    children = []
+                    content_children.append(children)
+                    self.body = child
+                context = (
+                    paragraph,
+                    tables,
+                    table,
+                    table_cell,
+                    in_body,
+                    row_index,
+                    children,
+                )
+            elif context[5] is not None or context[6] is not None:
+                # The row index and content children only apply to the
+                # children of the element they were recorded for
+                context = context[:5] + (None, None)
+
+            elements.append(child)
+            if len(child):
+                subtree_ends.append(0)
+                stack.append([
+                    child,
+                    iter(child),
+                    context,
+                    0,
+                    len(elements) - 1,
+                    0,
+                ])
+            else:
+                subtree_ends.append(len(elements))
+
+        self.tag_index = TagIndex(
+            elements=elements,
+            subtree_ends=subtree_ends,
+        )
+        columns = dict(
+            table=ancestor_tables,
+            table_cell=ancestor_table_cells,
+        )
+        if record_parents:
+            columns['parent'] = parents
+        self.meta_data = meta_data = ElementMetaData(
+            elements=elements,
+            ordinals=self.tag_index.ordinals,
+            **columns
+        )
+        for paragraph in paragraphs_in_tables:
+            meta_data.set_flag(paragraph, 'is_in_table')
+        for tc, (row_index, column_index) in zip(
+                table_cells,
+                table_cell_positions):
+            meta_data.set_index(tc, 'row_index', row_index)
+            meta_data.set_index(tc, 'column_index', column_index)
+
+    def _set_list_attributes(self):
+        for paragraph, num_tables in self._numbered_paragraphs:
+            ilvl = self.find_first(paragraph, 'ilvl')
+            # Deleted text in a list will have a numId but no ilvl.
+            if ilvl is None:
                 continue
-            self.meta_data[parent]['is_list_item'] = True
-            self.meta_data[parent]['num_id'] = self._generate_num_id(parent)
-            self.meta_data[parent]['ilvl'] = parent_ilvl.attrib['val']
+            self.meta_data.set_flag(paragraph, 'is_list_item')
+            self.meta_data.set_value(
+                paragraph,
+                'num_id',
+                self._generate_num_id(paragraph, num_tables),
+            )
+            self.meta_data.set_value(paragraph, 'ilvl', ilvl.attrib['val'])
 
-    def _generate_num_id(self, el):
+    def _generate_num_id(self, el, num_tables):
         '''
         Fun fact: It is possible to have a list in the root, that holds a table
         that holds a list and for both lists to have the same numId. When this
         happens we should namespace the nested list with the number of tables
         it is in to ensure it is considered a new list. Otherwise all sorts of
         terrible html gets generated.
+
+        `num_tables` is the number of tables that `el` is in, which is
+        counted while walking the tree.
         '''
-        num_id = find_first(el, 'numId').attrib['val']
-
-        # First, go up the parent until we get None and count the number of
-        # tables there are.
-        num_tables = 0
-        while self.parent(el) is not None:
-            if el.tag == 'tbl':
-                num_tables += 1
-            el = self.parent(el)
-        return NamespacedNumId(
-            num_id=num_id,
-            num_tables=num_tables,
-        )
+        num_id = self.find_first(el, 'numId').attrib['val']
+        key = (num_id, num_tables)
+        namespaced_num_id = self._num_ids.get(key)
+        if namespaced_num_id is None:
+            namespaced_num_id = NamespacedNumId(
+                num_id=num_id,
+                num_tables=num_tables,
+            )
+            self._num_ids[key] = namespaced_num_id
+        return namespaced_num_id
 
-    def _set_first_list_item(self, num_ids, ilvls, list_elements):
+    def _group_list_items(self, list_elements):
+        '''
+        Return the list items in `list_elements` grouped by their `num_id`
+        and `ilvl`, in a dict keyed by `(num_id, ilvl)`. The items of each
+        group stay in the order they were given in.
+        '''
+        groups = defaultdict(list)
+        for el in list_elements:
+            groups[(self.num_id(el), self.ilvl(el))].append(el)
+        return groups
+
+    def _set_first_list_item(self, groups):
         # Lists are grouped by having the same `num_id` and `ilvl`. The first
         # list item is the first list item found for each `num_id` and `ilvl`
         # combination.
-        if not ilvls:
+        if not groups:
             return
-        lowest_ilvl = min(int(i) for i in ilvls)
-        for num_id in num_ids:
-            for ilvl in ilvls:
-                filtered_list_elements = [
-                    i for i in list_elements
-                    if (
-                        self.num_id(i) == num_id and
-                        self.ilvl(i) == ilvl
-                    )
-                ]
-                if not filtered_list_elements:
-                    continue
-                # The root list needs to be handled a little differently. We
-                # only care about the first element in the root list.
-                if int(ilvl) == lowest_ilvl:
-                    filtered_list_elements = [filtered_list_elements[0]]
-
-                first_one_marked = False
-                for el in filtered_list_elements:
-                    prev_el = self.previous(el)
-                    if prev_el is None:
-                        self.meta_data[el]['is_first_list_item'] = True
-
-                    # If the current ilvl is greater than the previous then we
-                    # are starting a new list.
-                    if int(self.ilvl(prev_el) or 0) < int(self.ilvl(el)):
-                        self.meta_data[el]['is_first_list_item'] = True
-                    # The first list element in filtered_list_elements is
-                    # always the first list item, no matter what.
-                    if not first_one_marked:
-                        self.meta_data[el]['is_first_list_item'] = True
-                        first_one_marked = True
-
-    def _set_last_list_item(self, num_ids, list_elements):
+        lowest_ilvl = self.lowest_ilvl
+        if lowest_ilvl is None:
+            lowest_ilvl = min(int(ilvl) for _, ilvl in groups)
+        for (_, ilvl), filtered_list_elements in groups.items():
+            # The root list needs to be handled a little differently. We only
+            # care about the first element in the root list.
+            if int(ilvl) == lowest_ilvl:
+                filtered_list_elements = [filtered_list_elements[0]]
+
+            first_one_marked = False
+            for el in filtered_list_elements:
+                prev_el = self.previous(el)
+                if prev_el is None:
+                    self.meta_data.set_flag(el, 'is_first_list_item')
+
+                # If the current ilvl is greater than the previous then we are
+                # starting a new list.
+                if int(self.ilvl(prev_el) or 0) < int(self.ilvl(el)):
+                    self.meta_data.set_flag(el, 'is_first_list_item')
+                # The first list element in filtered_list_elements is always
+                # the first list item, no matter what.
+                if not first_one_marked:
+                    self.meta_data.set_flag(el, 'is_first_list_item')
+                    first_one_marked = True
+
+    def _set_last_list_item(self, list_elements):
         # Find last list elements. Only mark list tags as the last list tag if
         # it is in the root of the document. This is only used to ensure that
         # once a root level list is finished we do not roll in the rest of the
         # non list elements into the first root level list.
-        for num_id in num_ids:
-            filtered_list_elements = [
-                i for i in list_elements
-                if self.num_id(i) == num_id
-            ]
-            if not filtered_list_elements:
-                continue
-            last_el = filtered_list_elements[-1]
-            self.meta_data[last_el]['is_last_list_item_in_root'] = True
-
-    def _set_table_attributes(self, el):
-        tables = find_all(el, 'tbl')
-        for table in tables:
-            rows = filter_children(table, ['tr'])
-            if rows is None:
-                continue
-            for i, row in enumerate(rows):
-                tcs = filter_children(row, ['tc'])
-                for j, child in enumerate(tcs):
-                    self.meta_data[child]['row_index'] = i
-                    self.meta_data[child]['column_index'] = j
-                    v_merge = find_first(child, 'vMerge')
-                    if (
-                            v_merge is not None and
-                            ('continue' == v_merge.get('val', '') or
-                             v_merge.attrib == {})
-                    ):
-                        self.meta_data[child]['vmerge_continue'] = True
-
-    def _set_is_in_table(self, el):
-        paragraph_elements = find_all(el, 'p')
-        for p in paragraph_elements:
-            if find_ancestor_with_tag(self, p, 'tc') is not None:
-                self.meta_data[p]['is_in_table'] = True
+        last_list_items = {}
+        for el in list_elements:
+            last_list_items[self.num_id(el)] = el
+        for last_el in last_list_items.values():
+            self.meta_data.set_flag(last_el, 'is_last_list_item_in_root')
+
+    def _set_table_attributes(self):
+        # The row and column of each cell are recorded while walking the tree.
+        # The grid of each table is laid out once, from its first cell.
+        meta_data = self.meta_data
+        grids = {}
+        for tc in self._table_cells:
+            table = self.table(tc)
+            grid = grids.get(table)
+            if grid is None:
+                grid = grids[table] = TableGrid.load(table)
+            meta_data.set_index(tc, 'grid_column', grid.grid_column(tc))
+            meta_data.set_index(tc, 'rowspan', grid.rowspan(tc))
+            v_merge = self.find_first(tc, 'vMerge')
+            if (
+                    v_merge is not None and
+                    ('continue' == v_merge.get('val', '') or
+                     v_merge.attrib == {})
+            ):
+                meta_data.set_flag(tc, 'vmerge_continue')
 
     def _set_headers(self, elements):
-        # These are the styles for headers and what the html tag should be if
-        # we have one.
-        headers = {
-            'heading 1': 'h1',
-            'heading 2': 'h2',
-            'heading 3': 'h3',
-            'heading 4': 'h4',
-            'heading 5': 'h5',
-            'heading 6': 'h6',
-            'heading 7': 'h6',
-            'heading 8': 'h6',
-            'heading 9': 'h6',
-            'heading 10': 'h6',
-        }
-        # Remove the rPr from the styles dict since all the styling will be
-        # down with the heading.
-        for style in self.styles.styles:
-            if style.name.lower() in headers:
-                style.run_properties = None
-
+        # The run properties of heading styles are left out by the styles
+        # manager, since all the styling will be done with the heading.
         for element in elements:
-            # This element is using the default style which is not a heading.
-            p_style = find_first(element, 'pStyle')
-            if p_style is None:
-                continue
-            style = p_style.attrib.get('val', '')
-            style = self.styles.get_styles_by_type('paragraph').get(style)
-            if style:
-                style_name = style.name.lower()
-                # Check to see if this element is actually a header.
-                if style_name in headers:
-                    # Set all the list item variables to false.
-                    self.meta_data[element]['is_list_item'] = False
-                    self.meta_data[element]['is_first_list_item'] = False
-                    self.meta_data[element]['is_last_list_item_in_root'] = False  # noqa
-                    # Prime the heading_level
-                    self.meta_data[element]['heading_level'] = headers[style_name]  # noqa
+            heading_level = self.find_heading_level(element)
+            # Check to see if this element is actually a header.
+            if heading_level:
+                # Set all the list item variables to false.
+                self._clear_list_item(element)
+                # Prime the heading_level
+                self.meta_data.set_value(
+                    element,
+                    'heading_level',
+                    heading_level,
+                )
+
+    def _clear_list_item(self, el):
+        meta_data = self.meta_data
+        meta_data.set_flag(el, 'is_list_item', False)
+        meta_data.set_flag(el, 'is_first_list_item', False)
+        meta_data.set_flag(el, 'is_last_list_item_in_root', False)
 
     def _convert_upper_roman(self, body):
         if not self.convert_root_level_upper_roman:
@@ -313,64 +742,66 @@ class PydocxPreProcessor(MulitMemoizeMixin):
             # And only first_list_items
             if self.is_first_list_item(el)
         ]
-        visited_num_ids = []
-        all_p_tags_in_body = find_all(body, 'p')
+        if not first_root_list_items:
+            return
+        groups = self._group_list_items([
+            el for el in self.find_all(body, 'p')
+            if self.is_list_item(el)
+        ])
+        ilvls_by_num_id = defaultdict(list)
+        for num_id, ilvl in groups:
+            ilvls_by_num_id[num_id].append(ilvl)
+        visited_num_ids = set()
         for root_list_item in first_root_list_items:
-            if self.num_id(root_list_item) in visited_num_ids:
+            num_id = self.num_id(root_list_item)
+            if num_id in visited_num_ids:
                 continue
-            visited_num_ids.append(self.num_id(root_list_item))
-            lst_style = get_list_style(
-                self.numbering_root,
-                self.num_id(root_list_item).num_id,
+            visited_num_ids.add(num_id)
+            lst_style = self.numbering.get_format(
+                num_id.num_id,
                 self.ilvl(root_list_item),
             )
             if lst_style != 'upperRoman':
                 continue
-            ilvl = min(
-                self.ilvl(el) for el in all_p_tags_in_body
-                if self.num_id(el) == self.num_id(root_list_item)
-            )
-            root_upper_roman_list_items = [
-                el for el in all_p_tags_in_body
-                if self.num_id(el) == self.num_id(root_list_item) and
-                self.ilvl(el) == ilvl
-            ]
+            ilvl = min(ilvls_by_num_id[num_id])
+            root_upper_roman_list_items = groups[(num_id, ilvl)]
             for list_item in root_upper_roman_list_items:
-                self.meta_data[list_item]['is_list_item'] = False
-                self.meta_data[list_item]['is_first_list_item'] = False
-                self.meta_data[list_item]['is_last_list_item_in_root'] = False  # noqa
-
-                self.meta_data[list_item]['heading_level'] = UPPER_ROMAN_TO_HEADING_VALUE  # noqa
-
-    def _set_next(self, body):
-        def _get_children_with_content(el):
-            # We only care about children if they have text in them.
-            children = []
-            for child in filter_children(el, TAGS_HOLDING_CONTENT_TAGS):
-                _has_descendant_with_tag = any(
-                    has_descendant_with_tag(child, tag) for
-                    tag in TAGS_CONTAINING_CONTENT
+                self._clear_list_item(list_item)
+                self.meta_data.set_value(
+                    list_item,
+                    'heading_level',
+                    UPPER_ROMAN_TO_HEADING_VALUE,
                 )
-                if _has_descendant_with_tag:
-                    children.append(child)
-            return children
+
+    def _set_next(self):
+        meta_data = self.meta_data
 
         def _assign_next(children):
             # Populate the `next` attribute for all the child elements.
             for i in range(len(children)):
                 try:
                     if children[i + 1] is not None:
-                        self.meta_data[children[i]]['next'] = children[i + 1]  # noqa
+                        meta_data.set_element(
+                            children[i],
+                            'next',
+                            children[i + 1],
+                        )
                 except IndexError:
                     pass
                 try:
                     if children[i - 1] is not None:
-                        self.meta_data[children[i]]['previous'] = children[i - 1]  # noqa
+                        meta_data.set_element(
+                            children[i],
+                            'previous',
+                            children[i - 1],
+                        )
                 except IndexError:
                     pass
-        # Assign next for everything in the root.
-        _assign_next(_get_children_with_content(body))
-
-        # In addition set next for everything in table cells.
-        for tc in find_all(body, 'tc'):
-            _assign_next(_get_children_with_content(tc))
+        # Assign next for everything in the root, and in addition for
+        # everything in table cells.
+        for children in self._content_children:
+            # We only care about children if they have text in them.
+            _assign_next([
+                child for child in children
+                if self.has_content(child)
+            ])
@@ -5,6 +5,9 @@ from __future__ import (
 )
 
 import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 from xml.etree import cElementTree
 
 from pydocx.exceptions import MalformedDocxException
@@ -73,21 +76,232 @@ def has_descendant_with_tag(el, tag):
     return True if find_first(el, tag) is not None else False
 
 
+class TagIndex(object):
+    '''
+    Indexes every element beneath `root` in document order, so that the
+    descendant queries of `find_first`, `find_all` and
+    `has_descendant_with_tag` become binary searches instead of walks of the
+    subtree.
+
+    Each element is given its position in document order (its ordinal). The
+    descendants of an element are exactly the elements whose ordinals fall
+    between the element's own ordinal and the end of its subtree, so the
+    descendants with a given tag are a slice of the sorted ordinals recorded
+    for that tag.
+
+    The index must be rebuilt if the tree is changed. Elements that are not
+    part of the indexed tree are searched the usual way.
+
+    >>> root = cElementTree.fromstring('<a><b><c/></b><c/></a>')
+    >>> index = TagIndex(root)
+    >>> index.find_all(root, 'c') == [root[0][0], root[1]]
+    True
+    >>> index.find_first(root[0], 'c') is root[0][0]
+    True
+    >>> index.has_descendant_with_tag(root[1], 'c')
+    False
+    '''
+
+    def __init__(self, root=None, elements=None, subtree_ends=None):
+        '''
+        Index the tree under `root`. Alternatively, a traversal of the tree
+        that is made anyway can pass in the `elements` in document order along
+        with the `subtree_ends` of each, the ordinal following the last of the
+        element's descendants.
+        '''
+        if root is not None:
+            elements = list(el_iter(root))
+        if elements is None:
+            elements = []
+        self.elements = elements
+        self.ordinals = dict(zip(elements, range(len(elements))))
+        self.ordinals_by_tag = ordinals_by_tag = {}
+        for ordinal, el in enumerate(elements):
+            tag_ordinals = ordinals_by_tag.get(el.tag)
+            if tag_ordinals is None:
+                tag_ordinals = ordinals_by_tag[el.tag] = array('i')
+            tag_ordinals.append(ordinal)
+        if subtree_ends is None:
+            subtree_ends = self._get_subtree_ends()
+        self.subtree_ends = subtree_ends
+
+    def _get_subtree_ends(self):
+        # The subtree of an element ends where the subtree of its last child
+        # ends, so fill the ends in from the last element backwards.
+        elements = self.elements
+        ordinals = self.ordinals
+        subtree_ends = array('i', [0]) * len(elements)
+        for ordinal in range(len(elements) - 1, -1, -1):
+            el = elements[ordinal]
+            if len(el):
+                subtree_ends[ordinal] = subtree_ends[ordinals[el[-1]]]
+            else:
+                subtree_ends[ordinal] = ordinal + 1
+        return subtree_ends
+
+    def _descendant_range(self, ordinal, tag):
+        '''
+        Return the tag's ordinals along with the start and end of the slice
+        of them that are descendants of the element at `ordinal`.
+        '''
+        tag_ordinals = self.ordinals_by_tag.get(tag, ())
+        start = bisect_right(tag_ordinals, ordinal)
+        end = bisect_left(tag_ordinals, self.subtree_ends[ordinal], start)
+        return tag_ordinals, start, end
+
+    def find_first(self, el, tag):
+        ordinal = self.ordinals.get(el)
+        if ordinal is None:
+            return find_first(el, tag)
+        tag_ordinals, start, end = self._descendant_range(ordinal, tag)
+        if start == end:
+            return None
+        return self.elements[tag_ordinals[start]]
+
+    def find_all(self, el, tag):
+        ordinal = self.ordinals.get(el)
+        if ordinal is None:
+            return find_all(el, tag)
+        tag_ordinals, start, end = self._descendant_range(ordinal, tag)
+        elements = self.elements
+        return [elements[i] for i in tag_ordinals[start:end]]
+
+    def has_descendant_with_tag(self, el, tag):
+        ordinal = self.ordinals.get(el)
+        if ordinal is None:
+            return has_descendant_with_tag(el, tag)
+        _, start, end = self._descendant_range(ordinal, tag)
+        return start != end
+
+
+class NamespaceStrippingTreeBuilder(object):
+    '''
+    An XMLParser target that builds the element tree with the namespace
+    stripped from every tag and attribute name as each element is created.
+
+    >>> parser = cElementTree.XMLParser(target=NamespaceStrippingTreeBuilder())
+    >>> parser.feed('<w:p xmlns:w="ns"><w:t w:val="1">a</w:t></w:p>')
+    >>> root = parser.close()
+    >>> root.tag == 'p', root[0].tag == 't', root[0].attrib == {'val': '1'}
+    (True, True, True)
+    '''
+
+    def __init__(self, builder=None):
+        if builder is None:
+            builder = cElementTree.TreeBuilder()
+        self.builder = builder
+        # Documents only use a handful of distinct names, so strip each of
+        # them once.
+        self.names = {}
+
+    def strip_namespace(self, name):
+        stripped = self.names.get(name)
+        if stripped is None:
+            stripped = self.names[name] = name.split('}')[-1]
+        return stripped
+
+    def start(self, tag, attrib):
+        if attrib:
+            attrib = dict(
+                (self.strip_namespace(k), v)
+                for k, v in attrib.items()
+            )
+        return self.builder.start(self.strip_namespace(tag), attrib)
+
+    def end(self, tag):
+        return self.builder.end(self.strip_namespace(tag))
+
+    def data(self, data):
+        self.builder.data(data)
+
+    def close(self):
+        return self.builder.close()
+
+
+class BodyChildrenTreeBuilder(NamespaceStrippingTreeBuilder):
+    '''
+    A NamespaceStrippingTreeBuilder that collects each child of the document
+    body in `completed` as soon as its end tag has been parsed.
+    '''
+
+    def __init__(self, builder=None):
+        super(BodyChildrenTreeBuilder, self).__init__(builder=builder)
+        self.completed = []
+        self.depth = 0
+        self.body = None
+
+    def start(self, tag, attrib):
+        el = super(BodyChildrenTreeBuilder, self).start(tag, attrib)
+        self.depth += 1
+        if self.depth == 2 and el.tag == 'body':
+            self.body = el
+        return el
+
+    def end(self, tag):
+        el = super(BodyChildrenTreeBuilder, self).end(tag)
+        self.depth -= 1
+        if self.depth == 2 and self.body is not None:
+            self.completed.append(el)
+        elif self.depth == 1:
+            self.body = None
+        return el
+
+
+# The number of bytes fed to the parser at a time by iter_body_children
+PARSE_CHUNK_SIZE = 64 * 1024
+
+
+def iter_body_children(stream, chunk_size=PARSE_CHUNK_SIZE, engine=None):
+    '''
+    Incrementally parse the document in `stream`, stripping namespaces, and
+    yield each child of the body once it has been completely parsed.
+
+    Yielded elements are detached from the body, so the tree that is being
+    built never holds more than the element currently being parsed. The
+    memory used by an element is released once the caller drops it.
+    '''
+    if engine is None:
+        engine = ELEMENT_TREE_ENGINE
+    target = BodyChildrenTreeBuilder(builder=engine.create_tree_builder())
+    parser = engine.create_parser(target=target)
+    try:
+        while True:
+            data = stream.read(chunk_size)
+            if data:
+                parser.feed(data)
+            else:
+                parser.close()
+            for el in target.completed:
+                # The body stays open until the end of the document
+                if target.body is not None:
+                    target.body.remove(el)
+                yield el
+            del target.completed[:]
+            if not data:
+                break
+    except SyntaxError:
+        raise MalformedDocxException('This document cannot be converted.')
+
+
+def parse_xml_from_string(xml, engine=None):
+    '''
+    Parse the xml bytes into an element tree using `engine` (by default the
+    ElementTreeEngine), stripping all namespaces from tag and attribute names.
+    '''
+    if engine is None:
+        engine = ELEMENT_TREE_ENGINE
+    try:
+        return engine.parse_without_namespaces(xml)
+    except SyntaxError:
+        raise MalformedDocxException('This document cannot be converted.')
+
+
 def remove_namespaces(xml_bytes):
     """
     Given a stream of xml bytes, strip all namespaces from tag and attribute
     names.
     """
-    try:
-        root = cElementTree.fromstring(xml_bytes)
-    except SyntaxError:
-        raise MalformedDocxException('This document cannot be converted.')
-    for child in el_iter(root):
-        child.tag = child.tag.split("}")[-1]
-        child.attrib = dict(
-            (k.split("}")[-1], v)
-            for k, v in child.attrib.items()
-        )
+    root = parse_xml_from_string(xml_bytes)
     # Regardless of whatever the original encoding was
     # (fromstring deals with it for us), always deal in terms of utf-8
     # internally.
@@ -118,10 +332,6 @@ def get_list_style(numbering_root, num_id, ilvl):
                         return i.find('numFmt').attrib['val']
 
 
-def parse_xml_from_string(xml):
-    return cElementTree.fromstring(remove_namespaces(xml))
-
-
 def convert_dictionary_to_style_fragment(style):
     items = sorted(style.items())
     return ';'.join("%s:%s" % item for item in items)
@@ -168,3 +378,165 @@ class XmlNamespaceManager(object):
         for child in element:
             if child.tag.startswith(namespaces):
                 yield child
+
+
+class ElementTreeEngine(object):
+    '''
+    Builds element trees with the standard library's cElementTree. This is the
+    default engine.
+
+    An engine is what the package, the parts and the parser use to create
+    elements and to parse XML. Elements from different engines must not be
+    mixed within a tree.
+    '''
+
+    name = 'etree'
+
+    # Whether elements can return their own parent, see `get_parent`
+    has_parents = False
+
+    def __init__(self):
+        self.etree = cElementTree
+
+    def element(self, tag):
+        return self.etree.Element(tag)
+
+    def sub_element(self, parent, tag):
+        return self.etree.SubElement(parent, tag)
+
+    def fromstring(self, xml):
+        '''
+        Parse the xml bytes, keeping namespaces.
+        '''
+        return self.etree.fromstring(xml)
+
+    def create_tree_builder(self):
+        return self.etree.TreeBuilder()
+
+    def create_parser(self, target):
+        return self.etree.XMLParser(target=target)
+
+    def parse_without_namespaces(self, xml):
+        '''
+        Parse the xml bytes, stripping the namespaces from every tag and
+        attribute name. Raises SyntaxError for malformed XML.
+        '''
+        target = NamespaceStrippingTreeBuilder(
+            builder=self.create_tree_builder(),
+        )
+        parser = self.create_parser(target=target)
+        parser.feed(xml)
+        return parser.close()
+
+    def get_parent(self, el, root):
+        '''
+        Return the parent of `el` within the tree under `root`, or None if
+        `el` is `root` or is not part of that tree. Only available when
+        `has_parents` is set.
+        '''
+        raise NotImplementedError
+
+
+class LxmlEngine(ElementTreeEngine):
+    '''
+    Builds element trees with lxml, which parses faster than the standard
+    library and lets elements return their parent.
+    '''
+
+    name = 'lxml'
+    has_parents = True
+
+    # Rebuilds a tree with every element and attribute in no namespace, which
+    # lxml does natively instead of calling back into python for each element.
+    STRIP_NAMESPACES_XSLT = b'''<?xml version="1.0"?>
+        <xsl:stylesheet version="1.0"
+            xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
+            <xsl:template match="*">
+                <xsl:element name="{local-name()}">
+                    <xsl:apply-templates select="@*|node()"/>
+                </xsl:element>
+            </xsl:template>
+            <xsl:template match="@*">
+                <xsl:attribute name="{local-name()}">
+                    <xsl:value-of select="."/>
+                </xsl:attribute>
+            </xsl:template>
+            <xsl:template match="text()">
+                <xsl:copy/>
+            </xsl:template>
+        </xsl:stylesheet>
+    '''
+
+    def __init__(self):
+        from lxml import etree
+        self.etree = etree
+        # XSLT objects can't be shared between threads
+        self._local = threading.local()
+
+    def create_xml_parser(self, **kwargs):
+        # libxml2 rejects documents nested more than 256 elements deep unless
+        # huge_tree is set, which raises the limit to 2048, while ElementTree
+        # has no such limit. Tables nested in tables easily go deeper than
+        # 256. huge_tree also lifts libxml2's limits on the size of text
+        # nodes and names, which guard against malicious documents.
+        return self.etree.XMLParser(
+            resolve_entities=False,
+            no_network=True,
+            huge_tree=True,
+            **kwargs
+        )
+
+    def fromstring(self, xml):
+        return self.etree.fromstring(xml, parser=self.create_xml_parser())
+
+    def create_parser(self, target):
+        return self.create_xml_parser(target=target)
+
+    def parse_without_namespaces(self, xml):
+        if not isinstance(xml, bytes):
+            xml = xml.encode('utf-8')
+        strip_namespaces = getattr(self._local, 'strip_namespaces', None)
+        if strip_namespaces is None:
+            strip_namespaces = self._local.strip_namespaces = self.etree.XSLT(
+                self.etree.fromstring(self.STRIP_NAMESPACES_XSLT),
+            )
+        return strip_namespaces(self.fromstring(xml)).getroot()
+
+    def get_parent(self, el, root):
+        if el is root or el.getroottree().getroot() is not root:
+            return None
+        return el.getparent()
+
+
+ELEMENT_TREE_ENGINE = ElementTreeEngine()
+
+XML_ENGINES = {
+    ElementTreeEngine.name: ElementTreeEngine,
+    LxmlEngine.name: LxmlEngine,
+}
+
+_engines = {
+    ElementTreeEngine.name: ELEMENT_TREE_ENGINE,
+}
+
+
+def get_xml_engine(engine=None):
+    '''
+    Return the XML engine named `engine` ('etree' or 'lxml'). If `engine` is
+    None, cElementTree is used, so lxml is only used when asked for. Engine
+    instances are passed through as they are.
+
+    >>> get_xml_engine(None).name == 'etree'
+    True
+    '''
+    if engine is None:
+        return ELEMENT_TREE_ENGINE
+    if isinstance(engine, ElementTreeEngine):
+        return engine
+    if engine not in XML_ENGINES:
+        raise ValueError('Unknown XML engine "{engine}"'.format(
+            engine=engine,
+        ))
+    if engine not in _engines:
+        _engines[engine] = XML_ENGINES[engine]()
+    return _engines[engine]
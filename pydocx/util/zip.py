@@ -4,7 +4,10 @@ from __future__ import (
     unicode_literals,
 )
 
+import struct
+import sys
 import zipfile
+import zlib
 from contextlib import contextmanager
 
 try:
@@ -15,6 +18,21 @@ except ImportError:
 from pydocx.exceptions import MalformedDocxException
 
 
+# The fixed-size portion of a local file header, see section 4.3.7 of
+# https://pkware.cachefly.net/webdocs/casestudies/APPNOTE.TXT
+LOCAL_FILE_HEADER_SIGNATURE = b'PK\x03\x04'
+LOCAL_FILE_HEADER_SIZE = 30
+LOCAL_FILE_HEADER_LENGTHS = struct.Struct(str('<HH'))
+LOCAL_FILE_HEADER_LENGTHS_OFFSET = 26
+
+# Members are inflated this many (uncompressed) bytes at a time
+INFLATE_CHUNK_SIZE = 64 * 1024
+
+# On python 2, zlib only accepts strings and the old buffer objects, so
+# memoryview slices have to be copied before they're passed to it.
+ZLIB_ACCEPTS_MEMORYVIEW = sys.version_info[0] >= 3
+
+
 @contextmanager
 def ZipFile(path, mode='r'):  # This is not needed in python 3.2+
     try:
@@ -47,3 +65,97 @@ def create_zip_archive(paths_to_data):
                 continue
             zf.writestr(arcname, data.encode('utf-8'))
     return archive
+
+
+def can_read_member_from_buffer(member):
+    '''
+    Return True if `member` (a ZipInfo) can be read by
+    `iter_member_from_buffer`. Encrypted members, and members using anything
+    but the stored or deflated methods, need the full zipfile machinery.
+    '''
+    if member.flag_bits & 0x1:
+        return False
+    return member.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+
+
+def iter_member_from_buffer(buf, member, chunk_size=INFLATE_CHUNK_SIZE):
+    '''
+    Read the data for `member` (a ZipInfo) directly out of `buf`, a memoryview
+    of the whole archive.
+
+    A stored member is yielded as a single memoryview slice of `buf`, without
+    being copied. A deflated member is inflated straight from `buf`, and
+    yielded in chunks of at most `chunk_size` bytes so that the caller can
+    stop before the whole member has been allocated. The compressed data is
+    also fed to zlib `chunk_size` bytes at a time, so that it is never copied
+    as a whole where zlib can't read memoryviews.
+    '''
+    header_start = member.header_offset
+    header_end = header_start + LOCAL_FILE_HEADER_SIZE
+    header = buf[header_start:header_end].tobytes()
+    if (
+            len(header) != LOCAL_FILE_HEADER_SIZE or
+            not header.startswith(LOCAL_FILE_HEADER_SIGNATURE)):
+        raise MalformedDocxException(
+            'Bad local file header for "{name}"'.format(name=member.filename),
+        )
+    name_length, extra_length = LOCAL_FILE_HEADER_LENGTHS.unpack_from(
+        header,
+        LOCAL_FILE_HEADER_LENGTHS_OFFSET,
+    )
+    data_start = header_end + name_length + extra_length
+    data = buf[data_start:data_start + member.compress_size]
+    if len(data) != member.compress_size:
+        raise MalformedDocxException(
+            'Truncated data for "{name}"'.format(name=member.filename),
+        )
+
+    if member.compress_type == zipfile.ZIP_STORED:
+        crc = 0
+        for pending in _iter_zlib_input(data, chunk_size):
+            crc = zlib.crc32(pending, crc)
+        _check_crc(member, crc)
+        yield data
+        return
+
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+    crc = 0
+    try:
+        for pending in _iter_zlib_input(data, chunk_size):
+            while pending:
+                chunk = decompressor.decompress(pending, chunk_size)
+                tail = decompressor.unconsumed_tail
+                if not chunk and len(tail) == len(pending):
+                    break
+                pending = tail
+                if chunk:
+                    crc = zlib.crc32(chunk, crc)
+                    yield chunk
+        chunk = decompressor.flush()
+    except zlib.error:
+        raise MalformedDocxException(
+            'Unable to inflate "{name}"'.format(name=member.filename),
+        )
+    if chunk:
+        crc = zlib.crc32(chunk, crc)
+        yield chunk
+    _check_crc(member, crc)
+
+
+def _iter_zlib_input(data, chunk_size):
+    '''
+    Yield `data` (a memoryview) in slices of at most `chunk_size` bytes that
+    can be passed to zlib.
+    '''
+    for start in range(0, len(data), chunk_size):
+        pending = data[start:start + chunk_size]
+        if not ZLIB_ACCEPTS_MEMORYVIEW:
+            pending = pending.tobytes()
+        yield pending
+
+
+def _check_crc(member, crc):
+    if crc & 0xffffffff != member.CRC:
+        raise MalformedDocxException(
+            'Bad CRC-32 for "{name}"'.format(name=member.filename),
+        )
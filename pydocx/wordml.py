@@ -4,6 +4,9 @@ from __future__ import (
     unicode_literals,
 )
 
+from pydocx.exceptions import MalformedDocxException
+from pydocx.models.numbering import Numbering
+from pydocx.models.styles import Styles
 from pydocx.openxml import (
     OpenXmlPart,
     OpenXmlPackage,
@@ -25,6 +28,8 @@ class FootnotesPart(OpenXmlPart):
         'footnotes',
     ])
 
+    __slots__ = ()
+
 
 class ImagePart(OpenXmlPart):
     '''
@@ -41,6 +46,17 @@ class ImagePart(OpenXmlPart):
         'image',
     ])
 
+    __slots__ = ()
+
+    def preload(self):
+        # Images are not XML, so there is nothing to parse
+        if not self.open_xml_package.package.part_exists(self.uri):
+            return
+        try:
+            self.stream
+        except MalformedDocxException:
+            pass
+
 
 class StyleDefinitionsPart(OpenXmlPart):
     '''
@@ -57,6 +73,20 @@ class StyleDefinitionsPart(OpenXmlPart):
         'styles',
     ])
 
+    __slots__ = ('_styles',)
+
+    cacheable = True
+
+    def __init__(self, *args, **kwargs):
+        super(StyleDefinitionsPart, self).__init__(*args, **kwargs)
+        self._styles = None
+
+    @property
+    def styles(self):
+        if self._styles is None:
+            self._styles = self.get_loaded('styles', Styles.load)
+        return self._styles
+
 
 class NumberingDefinitionsPart(OpenXmlPart):
     '''
@@ -71,6 +101,20 @@ class NumberingDefinitionsPart(OpenXmlPart):
         'numbering',
     ])
 
+    __slots__ = ('_numbering',)
+
+    cacheable = True
+
+    def __init__(self, *args, **kwargs):
+        super(NumberingDefinitionsPart, self).__init__(*args, **kwargs)
+        self._numbering = None
+
+    @property
+    def numbering(self):
+        if self._numbering is None:
+            self._numbering = self.get_loaded('numbering', Numbering.load)
+        return self._numbering
+
 
 class FontTablePart(OpenXmlPart):
     '''
@@ -87,6 +131,8 @@ class FontTablePart(OpenXmlPart):
         'fontTable',
     ])
 
+    __slots__ = ()
+
 
 class MainDocumentPart(OpenXmlPart):
     '''
@@ -105,6 +151,8 @@ class MainDocumentPart(OpenXmlPart):
         'officeDocument',
     ])
 
+    __slots__ = ()
+
     child_part_types = [
         FontTablePart,
         FootnotesPart,
@@ -155,6 +203,8 @@ class WordprocessingDocument(OpenXmlPackage):
         'main',
     ])
 
+    __slots__ = ()
+
     child_part_types = [
         MainDocumentPart,
     ]